@@ -22,6 +22,7 @@
 
 from util import *
 import time, os
+import random
 import traceback
 import sys
 
@@ -159,11 +160,40 @@ class AgentState:
     def getDirection(self):
         return self.configuration.getDirection()
 
+class GridColumn(object):
+    """
+    A view of column x of a Grid, so that grid[x][y] reads and writes the bit of
+    cell (x,y).
+    """
+    __slots__ = ('grid', 'offset', 'height')
+
+    def __init__(self, grid, x):
+        self.grid = grid
+        self.offset = x * grid.height
+        self.height = grid.height
+
+    def __getitem__(self, y):
+        if y < 0 or y >= self.height: raise IndexError('Grid column index out of range')
+        return (self.grid.bits >> (self.offset + y)) & 1 == 1
+
+    def __setitem__(self, y, value):
+        if y < 0 or y >= self.height: raise IndexError('Grid column index out of range')
+        if value not in (False, True): raise Exception('Grids can only contain booleans')
+        if value:
+            self.grid.bits |= 1 << (self.offset + y)
+        else:
+            self.grid.bits &= ~(1 << (self.offset + y))
+
+    def __len__(self):
+        return self.height
+
 class Grid:
     """
-    A 2-dimensional array of objects backed by a list of lists.  Data is accessed
-    via grid[x][y] where (x,y) are positions on a Pacman map with x horizontal,
-    y vertical and the origin (0,0) in the bottom left corner.
+    A 2-dimensional array of booleans packed into the bits of a single int: cell (x,y)
+    is bit x * height + y.  Data is accessed via grid[x][y] where (x,y) are positions
+    on a Pacman map with x horizontal, y vertical and the origin (0,0) in the bottom
+    left corner.  Copies share the int (ints are immutable), count and asList work on
+    the set bits.
 
     The __str__ method constructs an output that is oriented like a pacman board.
     """
@@ -173,57 +203,66 @@ class Grid:
 
         self.width = width
         self.height = height
-        self.data = [[initialValue for y in range(height)] for x in range(width)]
+        self.bits = (1 << (width * height)) - 1 if initialValue else 0
+        self._columns = None # GridColumn views, made on first access
         if bitRepresentation:
             self._unpackBits(bitRepresentation)
 
     def __getitem__(self, i):
-        return self.data[i]
+        columns = self._columns
+        if columns is None:
+            columns = self._columns = [GridColumn(self, x) for x in range(self.width)]
+        return columns[i]
 
     def __setitem__(self, key, item):
-        self.data[key] = item
+        column = self[key]
+        for y in range(self.height):
+            column[y] = item[y]
 
     def __str__(self):
-        out = [[str(self.data[x][y])[0] for x in range(self.width)] for y in range(self.height)]
+        out = [[str(self[x][y])[0] for x in range(self.width)] for y in range(self.height)]
         out.reverse()
         return '\n'.join([''.join(x) for x in out])
 
     def __eq__(self, other):
         if other == None: return False
-        return self.data == other.data
+        return self.bits == other.bits and self.width == other.width and self.height == other.height
 
     def __hash__(self):
-        # return hash(str(self))
-        base = 1
-        h = 0
-        for l in self.data:
-            for i in l:
-                if i:
-                    h += base
-                base *= 2
-        return hash(h)
+        return hash(self.bits)
 
     def copy(self):
         g = Grid(self.width, self.height)
-        g.data = [x[:] for x in self.data]
+        g.bits = self.bits
         return g
 
     def deepCopy(self):
         return self.copy()
 
     def shallowCopy(self):
-        g = Grid(self.width, self.height)
-        g.data = self.data
-        return g
+        return self.copy()
 
     def count(self, item =True ):
-        return sum([x.count(item) for x in self.data])
+        if item == True:
+            return bin(self.bits).count('1')
+        if item == False:
+            return self.width * self.height - bin(self.bits).count('1')
+        return 0
 
     def asList(self, key = True):
+        if key == True:
+            bits = self.bits
+        elif key == False:
+            bits = ~self.bits & ((1 << (self.width * self.height)) - 1)
+        else:
+            return []
         list = []
-        for x in range(self.width):
-            for y in range(self.height):
-                if self[x][y] == key: list.append( (x,y) )
+        height = self.height
+        while bits:
+            lowest = bits & -bits
+            index = lowest.bit_length() - 1
+            list.append( (index // height, index % height) )
+            bits ^= lowest
         return list
 
     def packBits(self):
@@ -368,21 +407,45 @@ class Actions:
         return (x + dx, y + dy)
     getSuccessor = staticmethod(getSuccessor)
 
-class GameStateData:
+ZOBRIST_KEYS = {} # feature -> random key, see zobristKey
+
+def zobristKey( feature ):
+    """
+    Random 62 bit key of a hashable feature of a game state (an agent state, a food
+    dot, a capsule, the score).  Keys are drawn from a generator seeded with the hash
+    of the feature, so they are the same in every process.
     """
+    key = ZOBRIST_KEYS.get( feature )
+    if key is None:
+        key = ZOBRIST_KEYS[feature] = random.Random( hash( feature ) ).getrandbits( 62 )
+    return key
 
+class GameStateData:
+    """
+    A successor shares the food grid, the capsule list and the agent states of its
+    predecessor (copy-on-write).  Rules must not modify them in place: agent states
+    are changed through getMutableAgentState, capsules through removeCapsule, and food
+    through eatFood.
+
+    The number of food dots left and the hash are kept up to date as the state changes.
+    The hash is the XOR of the Zobrist keys of the agent states, the food dots, the
+    capsules and the score: eatFood and removeCapsule update it, updateHash does the
+    agent states and the score once a successor is complete.
     """
     def __init__( self, prevState = None ):
         """
-        Generates a new data packet by copying information from its predecessor.
+        Generates a new data packet by sharing information with its predecessor.
         """
         if prevState != None:
-            self.food = prevState.food.shallowCopy()
-            self.capsules = prevState.capsules[:]
-            self.agentStates = self.copyAgentStates( prevState.agentStates )
+            self.food = prevState.food
+            self.capsules = prevState.capsules
+            self.agentStates = prevState.agentStates[:]
+            self._ownedAgentStates = [False] * len( self.agentStates )
             self.layout = prevState.layout
             self._eaten = prevState._eaten
             self.score = prevState.score
+            self._foodCount = prevState._foodCount
+            self._hash = prevState._hash
 
         self._foodEaten = None
         self._foodAdded = None
@@ -395,6 +458,9 @@ class GameStateData:
     def deepCopy( self ):
         state = GameStateData( self )
         state.food = self.food.deepCopy()
+        state.capsules = self.capsules[:]
+        state.agentStates = self.copyAgentStates( self.agentStates )
+        state._ownedAgentStates = [True] * len( state.agentStates )
         state.layout = self.layout.deepCopy()
         state._agentMoved = self._agentMoved
         state._foodEaten = self._foodEaten
@@ -408,6 +474,66 @@ class GameStateData:
             copiedStates.append( agentState.copy() )
         return copiedStates
 
+    def getMutableAgentState( self, agentIndex ):
+        """
+        Returns the agent state of agentIndex for modification, copying it first
+        if it is still shared with the predecessor.
+        """
+        if not self._ownedAgentStates[agentIndex]:
+            self.agentStates[agentIndex] = self.agentStates[agentIndex].copy()
+            self._ownedAgentStates[agentIndex] = True
+        return self.agentStates[agentIndex]
+
+    def removeCapsule( self, position ):
+        """
+        Removes the capsule at position without changing the predecessor's list.
+        """
+        if position in self.capsules:
+            self.capsules = [capsule for capsule in self.capsules if capsule != position]
+            self._hash ^= zobristKey( ('capsule', position) )
+
+    def eatFood( self, position ):
+        """
+        Removes the food at position, copying the food grid shared with the predecessor.
+        """
+        x, y = position
+        self.food = self.food.copy()
+        self.food.bits &= ~(1 << (x * self.food.height + y))  # clear the bit, without building column views
+        self._foodCount -= 1
+        self._hash ^= zobristKey( ('food', position) )
+
+    def getNumFood( self ):
+        return self._foodCount
+
+    def agentKey( self, agentIndex ):
+        agentState = self.agentStates[agentIndex]
+        configuration = agentState.configuration
+        return zobristKey( (agentIndex, configuration.pos, configuration.direction, agentState.scaredTimer) )
+
+    def computeHash( self ):
+        """
+        Hashes the whole state, updateHash gives the same value incrementally.
+        """
+        h = zobristKey( ('score', self.score) )
+        for agentIndex in range( len( self.agentStates ) ):
+            h ^= self.agentKey( agentIndex )
+        for position in self.food.asList():
+            h ^= zobristKey( ('food', position) )
+        for position in self.capsules:
+            h ^= zobristKey( ('capsule', position) )
+        return h
+
+    def updateHash( self, prevState ):
+        """
+        Brings the hash inherited from prevState up to date for the score and the
+        agent states copied by getMutableAgentState.
+        """
+        h = self._hash ^ zobristKey( ('score', prevState.score) ) ^ zobristKey( ('score', self.score) )
+        for agentIndex, owned in enumerate( self._ownedAgentStates ):
+            if owned:
+                h ^= prevState.agentKey( agentIndex ) ^ self.agentKey( agentIndex )
+        self._hash = h
+
     def __eq__( self, other ):
         """
         Allows two states to be compared.
@@ -424,17 +550,11 @@ class GameStateData:
         """
         Allows states to be keys of dictionaries.
         """
-        for i, state in enumerate( self.agentStates ):
-            try:
-                int(hash(state))
-            except TypeError, e:
-                print e
-                #hash(state)
-        return int((hash(tuple(self.agentStates)) + 13*hash(self.food) + 113* hash(tuple(self.capsules)) + 7 * hash(self.score)) % 1048575 )
+        return self._hash
 
     def __str__( self ):
         width, height = self.layout.width, self.layout.height
-        map = Grid(width, height)
+        map = [[None for y in range(height)] for x in range(width)]
         if type(self.food) == type((1,2)):
             self.food = reconstituteGrid(self.food)
         for x in range(width):
@@ -455,7 +575,9 @@ class GameStateData:
         for x, y in self.capsules:
             map[x][y] = 'o'
 
-        return str(map) + ("\nScore: %d\n" % self.score)
+        out = [''.join([map[x][y] for x in range(width)]) for y in range(height)]
+        out.reverse()
+        return '\n'.join(out) + ("\nScore: %d\n" % self.score)
 
     def _foodWallStr( self, hasFood, hasWall ):
         if hasFood:
@@ -502,7 +624,10 @@ class GameStateData:
                 if numGhosts == numGhostAgents: continue # Max ghosts reached already
                 else: numGhosts += 1
             self.agentStates.append( AgentState( Configuration( pos, Directions.STOP), isPacman) )
+        self._ownedAgentStates = [True for a in self.agentStates]
         self._eaten = [False for a in self.agentStates]
+        self._foodCount = self.food.count()
+        self._hash = self.computeHash()
 
 try:
     import boinc
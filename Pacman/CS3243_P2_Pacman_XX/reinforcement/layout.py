@@ -16,6 +16,7 @@ from util import manhattanDistance
 from game import Grid
 import os
 import random
+import copy
 
 VISIBILITY_MATRIX_CACHE = {}
 
@@ -90,7 +91,17 @@ class Layout:
         return "\n".join(self.layoutText)
 
     def deepCopy(self):
-        return Layout(self.layoutText[:])
+        """
+        Copies the parsed board rather than parsing layoutText again (Grid copies are
+        cheap), the game deep copies its state for every move.
+        """
+        layout = copy.copy(self)
+        layout.layoutText = self.layoutText[:]
+        layout.walls = self.walls.copy()
+        layout.food = self.food.copy()
+        layout.capsules = self.capsules[:]
+        layout.agentPositions = self.agentPositions[:]
+        return layout
 
     def processLayoutText(self, layoutText):
         """
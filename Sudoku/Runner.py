@@ -24,6 +24,8 @@ root_output_file = "output.out"
 solver_file_names = {
     1: "Sudoku_DegreeHeuristic.py",
     2: "Sudoku_ValueOrdering.py",
+    3: "Sudoku_Bitmask.py",
+    4: "Sudoku_DancingLinks.py",
 }
 
 """
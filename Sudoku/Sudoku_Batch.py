@@ -0,0 +1,57 @@
+import sys
+import csv
+import time
+import multiprocessing
+import Sudoku_Experiments as Experiments
+
+"""
+Batch Experiment Data Generator
+Writes the same per-variant time and steps columns as Sudoku_Experiments.py, but loads every input once and
+solves the puzzles across a pool of worker processes. Rows are written as soon as each puzzle is solved,
+so they come out in completion order rather than file order.
+
+python Sudoku_Batch.py [num_processes] [csv_file_name]
+num_processes defaults to the number of CPUs
+"""
+
+# File/Directory Variables
+csv_file_name = "./experiments_batch.csv"
+chunk_size = 4  # puzzles handed to a worker at a time
+
+
+# Generator of CSV rows (see Sudoku_Experiments.extract_row), in the order the puzzles finish
+def solve_batch(input_data_list, num_processes):
+    pool = multiprocessing.Pool(num_processes)
+    try:
+        for row in pool.imap_unordered(Experiments.extract_row, input_data_list, chunk_size):
+            yield row
+    finally:
+        pool.close()
+        pool.join()
+
+
+def run_batch(input_data_list, num_processes, output_file_name):
+    start_time = time.time()
+    solved_count = 0
+    with Experiments.open_csv_file(output_file_name) as f:
+        w = csv.writer(f)
+        w.writerow(Experiments.csv_header)
+        for row in solve_batch(input_data_list, num_processes):
+            w.writerow(row)
+            f.flush()
+            solved_count += 1
+    time_taken = (time.time() - start_time) * 1000
+    print("Batch of {0} puzzles on {1} processes: Time Taken (in ms) = {2}".format(
+        solved_count, num_processes, time_taken))
+
+
+if __name__ == "__main__":
+    num_processes = int(sys.argv[1]) if len(sys.argv) > 1 else multiprocessing.cpu_count()
+    output_file_name = sys.argv[2] if len(sys.argv) > 2 else csv_file_name
+    if len(sys.argv) > 3:
+        raise ValueError("Unknown command line arguments!")
+
+    input_file_names = Experiments.get_input_file_names()
+    input_data_list = Experiments.get_sudoku_input_data(input_file_names)
+    run_batch(input_data_list, num_processes, output_file_name)
+    print("CSV File Generated!")
@@ -0,0 +1,138 @@
+import os
+import sys
+import json
+import time
+import Sudoku_Experiments as Experiments
+import Sudoku_DegreeHeuristic as SudokuDegreeHeuristic
+import Sudoku_ValueOrdering as SudokuValueOrdering
+import Sudoku_Bitmask as SudokuBitmask
+import Sudoku_DancingLinks as SudokuDancingLinks
+from Sudoku_Portfolio import percentile
+
+"""
+Regression Benchmark
+Runs every variant over a fixed corpus (the first num_inputs inputs of the test dir, sorted by file name):
+warmup puzzles first (not timed), then every puzzle repetitions times. The time of a puzzle is its best
+repetition, which filters out most of the noise of a shared machine. Records per variant the median and
+95th percentile time per puzzle, the throughput (puzzles per second over the corpus) and the total steps_taken.
+
+python Sudoku_Benchmark.py baseline.json [num_inputs] [threshold]
+If baseline.json does not exist, the results are stored in it as the baseline. Otherwise they are compared
+with it and the script exits with status 1 if the throughput of some variant dropped by more than threshold
+(a fraction, 0.15 by default). Delete the file to record a new baseline
+"""
+
+default_num_inputs = 200
+default_threshold = 0.15  # repeated runs of the same code vary by up to ~10% on a shared machine
+warmup = 20  # puzzles solved by every variant before timing
+repetitions = 5  # best of
+
+# Best clock available, time.perf_counter is Python 3 only
+timer = getattr(time, "perf_counter", time.time)
+
+# (name, module, keyword arguments of Sudoku). Callable arguments are called for every solve (fresh rule objects)
+variants = [
+    ("DH (fc)", SudokuDegreeHeuristic, {}),
+    ("DH (mac + rules)", SudokuDegreeHeuristic, {"propagation": SudokuDegreeHeuristic.MAC,
+                                                 "rules": SudokuDegreeHeuristic.default_rules}),
+    ("VO (fc)", SudokuValueOrdering, {}),
+    ("BM", SudokuBitmask, {}),
+    ("DLX", SudokuDancingLinks, {}),
+]
+
+
+# Solves puzzle once with the variant, returns (wall time in ms, steps_taken)
+def time_solve(variant, puzzle):
+    name, module, kwargs = variant
+    kwargs = dict((key, value() if callable(value) else value) for key, value in kwargs.items())
+    start_time = timer()
+    sudoku = module.Sudoku([row[:] for row in puzzle], **kwargs)
+    sudoku.solve()
+    return (timer() - start_time) * 1000, sudoku.steps_taken
+
+
+# Benchmarks one variant on puzzles, returns its results as a dict
+def benchmark_variant(variant, puzzles):
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')  # solve prints its timing line
+    try:
+        for puzzle in puzzles[:warmup]:
+            time_solve(variant, puzzle)
+        times = list()
+        steps = 0
+        for puzzle in puzzles:
+            results = [time_solve(variant, puzzle) for _ in range(repetitions)]
+            times.append(min(time_taken for time_taken, steps_taken in results))
+            steps += results[0][1]
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return {
+        "median_ms": percentile(times, 50),
+        "p95_ms": percentile(times, 95),
+        "throughput": len(times) / (sum(times) / 1000),
+        "steps": steps,
+    }
+
+
+def run_benchmark(num_inputs):
+    input_file_names = sorted(Experiments.get_input_file_names())[:num_inputs]
+    puzzles = [puzzle for input_file_name, blank_tiles_count, puzzle
+               in Experiments.get_sudoku_input_data(input_file_names)]
+    results = dict()
+    for variant in variants:
+        results[variant[0]] = benchmark_variant(variant, puzzles)
+    return {"num_inputs": len(puzzles), "repetitions": repetitions, "variants": results}
+
+
+def print_results(results, baseline=None):
+    print("{0:<18} {1:>12} {2:>10} {3:>16} {4:>10}".format("Variant", "Median (ms)", "p95 (ms)", "Puzzles per s",
+                                                            "Steps"))
+    for name, result in sorted(results["variants"].items()):
+        line = "{0:<18} {1:>12.3f} {2:>10.3f} {3:>16.1f} {4:>10}".format(
+            name, result["median_ms"], result["p95_ms"], result["throughput"], result["steps"])
+        previous = baseline["variants"].get(name) if baseline is not None else None
+        if previous is not None:
+            line += "   throughput {0:+.1%}".format(result["throughput"] / previous["throughput"] - 1)
+            if result["steps"] != previous["steps"]:
+                line += ", steps {0} -> {1}".format(previous["steps"], result["steps"])
+        print(line)
+
+
+# Names of the variants whose throughput dropped by more than threshold (a fraction) from baseline
+def find_regressions(results, baseline, threshold):
+    regressions = list()
+    for name, result in sorted(results["variants"].items()):
+        previous = baseline["variants"].get(name)
+        if previous is not None and result["throughput"] < previous["throughput"] * (1 - threshold):
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    if not 2 <= len(sys.argv) <= 4:
+        print("\nUsage: python Sudoku_Benchmark.py baseline.json [num_inputs] [threshold]\n")
+        raise ValueError("Wrong number of arguments!")
+    baseline_file_name = os.path.abspath(sys.argv[1])  # the test dir loading changes the working directory
+    num_inputs = int(sys.argv[2]) if len(sys.argv) > 2 else default_num_inputs
+    threshold = float(sys.argv[3]) if len(sys.argv) > 3 else default_threshold
+
+    results = run_benchmark(num_inputs)
+    if not os.path.exists(baseline_file_name):
+        print_results(results)
+        with open(baseline_file_name, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print("Baseline stored in {0}".format(baseline_file_name))
+        sys.exit(0)
+
+    with open(baseline_file_name, 'r') as f:
+        baseline = json.load(f)
+    if baseline["num_inputs"] != results["num_inputs"]:
+        raise ValueError("Baseline was recorded on {0} inputs, not {1}".format(baseline["num_inputs"],
+                                                                              results["num_inputs"]))
+    print_results(results, baseline)
+    regressions = find_regressions(results, baseline, threshold)
+    if regressions:
+        print("Throughput regressed by more than {0:.0%}: {1}".format(threshold, ", ".join(regressions)))
+        sys.exit(1)
+    print("No regression beyond {0:.0%}".format(threshold))
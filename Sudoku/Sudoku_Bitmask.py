@@ -0,0 +1,296 @@
+import sys, copy, time
+from Sudoku_Tables import get_tables, box_size_of
+
+# Running script: given code can be run with the command:
+# python file.py, ./path/to/init_state.txt ./output/output.txt
+
+"""
+Bitmask Domain Variant
+Same search as the Degree Heuristic variant (Forward Checking + MRV + Degree tie-breaking),
+but every domain is stored as an N-bit integer (9 bits on a 9x9 grid) instead of a Python set.
+Bit (v - 1) of a mask is set if value v is still in the domain.
+"""
+
+# Largest N for which popcount and mask_values are precomputed tuples (2^16 entries), larger grids compute them
+MAX_TABLE_BITS = 16
+
+
+# Stands in for a lookup table too large to precompute, table[mask] calls fn(mask)
+class ComputedTable(object):
+    def __init__(self, fn):
+        self.fn = fn
+
+    def __getitem__(self, mask):
+        return self.fn(mask)
+
+
+"""
+Bit tables of an N-value grid, built once per N and cached
+"""
+class BitTables(object):
+    def __init__(self, size):
+        self.full_mask = (1 << size) - 1  # all values 1..N allowed
+        values = tuple(range(1, size + 1))
+
+        def popcount(mask):
+            return bin(mask).count("1")
+
+        def mask_values(mask):
+            return tuple(v for v in values if mask & (1 << (v - 1)))
+
+        if size <= MAX_TABLE_BITS:
+            # popcount[mask] = number of values left in the domain represented by mask
+            self.popcount = tuple(popcount(mask) for mask in range(self.full_mask + 1))
+            # mask_values[mask] = tuple of values (ascending) represented by mask
+            self.mask_values = tuple(mask_values(mask) for mask in range(self.full_mask + 1))
+        else:
+            self.popcount = ComputedTable(popcount)
+            self.mask_values = ComputedTable(mask_values)
+
+        # value_bit[v] = bit representing value v. value_bit[0] is unused (0 means blank)
+        self.value_bit = tuple([0] + [1 << (v - 1) for v in values])
+
+
+_bit_tables_by_size = dict()
+
+
+def get_bit_tables(size=9):
+    if size not in _bit_tables_by_size:
+        _bit_tables_by_size[size] = BitTables(size)
+    return _bit_tables_by_size[size]
+
+
+"""
+Assignment represents the state of the current CSP assignment.
+Keeps one occupancy mask per row, column and grid so consistency checks are bitwise ANDs.
+If number of unassigned variables = 0, it is complete
+"""
+class Assignment(object):
+    def __init__(self, list_of_cells, tables=None):
+        self.tables = tables if tables is not None else get_tables(box_size_of(list_of_cells))
+        self.row_of = self.tables.row_of
+        self.col_of = self.tables.col_of
+        self.box_of = self.tables.box_of
+        self.value_bit = get_bit_tables(self.tables.size).value_bit
+        size = self.tables.size
+        self.values = [0] * self.tables.num_cells  # maps flat index to a value, 0 means unassigned
+        self.row_masks = [0] * size
+        self.col_masks = [0] * size
+        self.box_masks = [0] * size
+        num_of_fixed_values = 0  # counting number of unassigned variables left
+        for i in range(0, size):
+            for j in range(0, size):
+                curr_value = list_of_cells[i][j]
+                if curr_value != 0:  # not 0 means variable has been assigned
+                    num_of_fixed_values += 1
+                    self.place(i * size + j, curr_value)
+        self.unassigned_count = self.tables.num_cells - num_of_fixed_values
+
+    def place(self, index, value):
+        bit = self.value_bit[value]
+        self.values[index] = value
+        self.row_masks[self.row_of[index]] |= bit
+        self.col_masks[self.col_of[index]] |= bit
+        self.box_masks[self.box_of[index]] |= bit
+
+    def is_complete(self):
+        return self.unassigned_count == 0
+
+    def assign(self, index, value):
+        self.place(index, value)
+        self.unassigned_count -= 1
+
+    def reset(self, index):
+        value = self.values[index]
+        if value != 0:
+            bit = self.value_bit[value]
+            self.values[index] = 0
+            self.row_masks[self.row_of[index]] &= ~bit
+            self.col_masks[self.col_of[index]] &= ~bit
+            self.box_masks[self.box_of[index]] &= ~bit
+            self.unassigned_count += 1
+
+    # Mask of values already used by the row, column and grid of index
+    def used_mask(self, index):
+        return self.row_masks[self.row_of[index]] | self.col_masks[self.col_of[index]] | self.box_masks[self.box_of[index]]
+
+    def is_consistent_with(self, index, value):
+        return not (self.used_mask(index) & self.value_bit[value])
+
+    def get_degree(self, index):
+        degree_count = 0
+        values = self.values
+        for n in self.tables.peers[index]:
+            if values[n] == 0:
+                degree_count += 1
+        return degree_count
+
+
+"""
+Encapsulates all variables that needs to be assigned
+Single Instance only - stored as an attribute in Sudoku Object
+"""
+class CSP(object):
+    def __init__(self, list_of_cells, tables=None):
+        self.tables = tables if tables is not None else get_tables(box_size_of(list_of_cells))
+        self.bit_tables = get_bit_tables(self.tables.size)
+        size = self.tables.size
+        self.domains = [0] * self.tables.num_cells  # maps flat index to its domain mask, 0 for given cells
+        self.unassigned = set()  # flat indices that still need a value
+        for i in range(0, size):
+            for j in range(0, size):
+                if list_of_cells[i][j] == 0:  # 0 means unassigned initially, is a variable to consider
+                    self.domains[i * size + j] = self.bit_tables.full_mask
+                    self.unassigned.add(i * size + j)
+
+    def size(self):
+        return len(self.unassigned)
+
+    def get_domain_values(self, index):
+        return self.bit_tables.mask_values[self.domains[index]]
+
+
+class Sudoku(object):
+    def __init__(self, puzzle):
+        self.tables = get_tables(box_size_of(puzzle))  # puzzle is N x N, with N = box size * box size
+        self.bit_tables = get_bit_tables(self.tables.size)
+        self.puzzle = puzzle  # self.puzzle is a 2D List of Integers.
+        self.ans = copy.deepcopy(puzzle)  # self.ans is a 2D list of Integers. Will be returned to driver method for output
+        self.assignment = Assignment(puzzle, self.tables)  # initialize assignment based on given input
+        self.csp = CSP(puzzle, self.tables)
+        self.steps_taken = 0
+        self.time_taken = 0
+
+    # Use MRV Minimum Remaining Values Heuristic to select variable, ties broken by Degree Heuristic
+    # Returns flat index of the variable with MRV
+    def select_unassigned_variable(self):
+        domains = self.csp.domains
+        popcount = self.bit_tables.popcount
+        min_domain_size = self.tables.size + 1
+        min_index = -1
+        min_degree = -1
+        for index in self.csp.unassigned:
+            curr_domain_size = popcount[domains[index]]
+            if curr_domain_size < min_domain_size:
+                min_domain_size = curr_domain_size
+                min_index = index
+                min_degree = -1  # only computed when a tie needs to be broken
+            elif curr_domain_size == min_domain_size:
+                if min_degree == -1:
+                    min_degree = self.assignment.get_degree(min_index)
+                key_degree = self.assignment.get_degree(index)
+                if key_degree >= min_degree:
+                    min_index = index
+                    min_degree = key_degree
+        return min_index
+
+    """
+    Inference is forward checking only.
+    If some domain of its neighbour is reduced to empty, then current value to variable assignment is illegal,
+    will return False.
+    Else, will return the list of flat indices whose domains have their value removed
+    """
+    def inference(self, csp, index, value):
+        bit = self.bit_tables.value_bit[value]
+        domains = csp.domains
+        unassigned = csp.unassigned
+        indices_with_value_removed = []
+
+        for n in self.tables.peers[index]:
+            if n in unassigned and domains[n] & bit:
+                domains[n] &= ~bit
+                indices_with_value_removed.append(n)
+                if not domains[n]:
+                    # Failure detected, add VALUE back into any reduced domains
+                    for m in indices_with_value_removed:
+                        domains[m] |= bit
+                    return False
+
+        return indices_with_value_removed
+
+    def backtrack(self, assignment, csp):
+        if assignment.is_complete():
+            return assignment
+
+        self.steps_taken += 1
+
+        curr_index = self.select_unassigned_variable()
+        csp.unassigned.remove(curr_index)
+        for x in csp.get_domain_values(curr_index):
+            if assignment.is_consistent_with(curr_index, x):
+                assignment.assign(curr_index, x)
+                inference = self.inference(csp, curr_index, x)
+                if inference is not False:
+                    result = self.backtrack(assignment, csp)
+                    # SUCCESS SCENARIO
+                    if result is not False:
+                        return result
+
+                    # Failure in one of the sub-trees, this x value is not chosen, undo domain reduction
+                    bit = self.bit_tables.value_bit[x]
+                    for n in inference:
+                        csp.domains[n] |= bit
+
+                assignment.reset(curr_index)
+        csp.unassigned.add(curr_index)
+        return False
+
+    def backtrack_search(self, csp):
+        return self.backtrack(self.assignment, csp)
+
+    # Method to initially reduce domains of all variables based on already assigned cells
+    def initial_domain_reduction(self):
+        for index in self.csp.unassigned:
+            self.csp.domains[index] &= ~self.assignment.used_mask(index)
+
+    def solve(self):
+        start_time = time.time()
+        # Pre-processing to reduce domains
+        self.initial_domain_reduction()
+        # Actual backtracking
+        valid_assignment = self.backtrack_search(self.csp)
+        self.time_taken = (time.time() - start_time) * 1000
+        print("Inference + MRV + Degree Heuristic (Bitmask) Variant: Time Taken (in ms) = {0}, Steps = {1}".format(self.time_taken, str(self.steps_taken)))
+
+        # Writing assignment to self.ans for output. Without a solution self.ans is left as the puzzle given
+        if valid_assignment is not False:
+            for index in range(self.tables.num_cells):
+                (i, j) = self.tables.positions[index]
+                self.ans[i][j] = valid_assignment.values[index]
+
+        return self.ans
+
+
+if __name__ == "__main__":
+    # STRICTLY do NOT modify the code in the main function here
+    if len(sys.argv) != 3:
+        print("\nUsage: python CS3243_P2_Sudoku_XX.py input.txt output.txt\n")
+        raise ValueError("Wrong number of arguments!")
+
+    try:
+        f = open(sys.argv[1], 'r')
+    except IOError:
+        print("\nUsage: python CS3243_P2_Sudoku_XX.py input.txt output.txt\n")
+        raise IOError("Input file not found!")
+
+    puzzle = [[0 for i in range(9)] for j in range(9)]
+    lines = f.readlines()
+
+    i, j = 0, 0
+    for line in lines:
+        for number in line:
+            if '0' <= number <= '9':
+                puzzle[i][j] = int(number)
+                j += 1
+                if j == 9:
+                    i += 1
+                    j = 0
+
+    sudoku = Sudoku(puzzle)
+    ans = sudoku.solve()
+
+    with open(sys.argv[2], 'a') as f:
+        for i in range(9):
+            for j in range(9):
+                f.write(str(ans[i][j]) + " ")
+            f.write("\n")
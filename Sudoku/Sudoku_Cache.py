@@ -0,0 +1,270 @@
+import os
+import json
+import itertools
+from collections import OrderedDict
+
+"""
+Solution Cache keyed by canonical puzzle form
+Many puzzles are the same puzzle after a symmetry transform: transposition, band swaps, row swaps within a band,
+stack swaps, column swaps within a stack and digit relabelling. canonicalize maps every puzzle of such a class
+to the same canonical puzzle, together with the transform that takes the puzzle there, so one cached solution
+serves the whole class and is mapped back to the orientation and digits of the puzzle it is looked up for.
+
+Canonical form (9x9 grids only):
+1) Pattern first: among all 2 * 6^8 row/column transforms, keep those that give the lexicographically smallest
+   sequence of row masks (bit set for a given cell). Columns are searched exhaustively (2 x 1296 transforms,
+   per-stack permutation tables), rows then follow by sorting rows within bands and bands.
+2) Digits: every transform tied on the pattern is applied with digits relabelled by first appearance,
+   the smallest resulting string is the canonical form.
+If the pattern has more than max_tied_transforms ties (e.g. a nearly full grid) the tie break is skipped and
+the puzzle is keyed by its own relabelled string. Such puzzles only miss the symmetric cache entries.
+
+Usage: Sudoku(puzzle, cache=SolutionCache("solutions.json")) checks the cache before searching
+"""
+
+max_tied_transforms = 2000
+default_capacity = 100000  # cached solutions kept, least recently used are evicted
+default_save_every = 100  # new solutions stored between writes of the cache file
+
+PERMUTATIONS_3 = tuple(itertools.permutations(range(3)))
+
+# PERMUTED_TRIPLET[p][triplet] = 3-bit triplet (bit 2 is the first column) with its columns reordered by p
+PERMUTED_TRIPLET = tuple(tuple(sum(1 << (2 - j) for j in range(3) if triplet & (1 << (2 - p[j])))
+                               for triplet in range(8)) for p in PERMUTATIONS_3)
+
+
+"""
+Row/column transform followed by a digit relabelling, taking a puzzle to its canonical form.
+Canonical cell (r, c) holds digit_map[v], v being cell (row_order[r], col_order[c]) of the (transposed) puzzle
+"""
+class Transform(object):
+    def __init__(self, transposed, row_order, col_order, digit_map):
+        self.transposed = transposed
+        self.row_order = row_order
+        self.col_order = col_order
+        self.digit_map = digit_map  # maps every digit 0..9 to its canonical digit, 0 maps to 0
+
+    # Flat index in the original puzzle of every canonical cell
+    def source_indices(self):
+        if self.transposed:
+            return [col * 9 + row for row in self.row_order for col in self.col_order]
+        return [row * 9 + col for row in self.row_order for col in self.col_order]
+
+    # Canonical form of a flat grid (the puzzle or one of its solutions)
+    def apply(self, cells):
+        digit_map = self.digit_map
+        return [digit_map[cells[index]] for index in self.source_indices()]
+
+    # Flat grid in the original orientation and digits, from a canonical flat grid
+    def invert(self, canonical_cells):
+        original_digit = [0] * 10
+        for digit, canonical_digit in enumerate(self.digit_map):
+            original_digit[canonical_digit] = digit
+        cells = [0] * 81
+        for canonical_index, index in enumerate(self.source_indices()):
+            cells[index] = original_digit[canonical_cells[canonical_index]]
+        return cells
+
+
+# Digit map relabelling digits 1..9 by order of first appearance in cells (unused digits follow, in order)
+def relabel_by_first_appearance(cells):
+    digit_map = [0] * 10
+    next_digit = 1
+    for value in cells:
+        if value and not digit_map[value]:
+            digit_map[value] = next_digit
+            next_digit += 1
+    for value in range(1, 10):
+        if not digit_map[value]:
+            digit_map[value] = next_digit
+            next_digit += 1
+    return digit_map
+
+
+# Lists of rows (original indices) giving each band its sorted masks, all orders of equal masks included
+def band_row_orders(masks, band):
+    rows = sorted(range(band * 3, band * 3 + 3), key=lambda row: masks[row])
+    orders = set()
+    for order in itertools.permutations(rows):
+        if [masks[row] for row in order] == [masks[row] for row in rows]:
+            orders.add(order)
+    return sorted(orders)
+
+
+# Every row order giving the smallest row mask sequence for the given (column transformed) row masks
+def row_orders(masks):
+    band_keys = [tuple(sorted(masks[band * 3:band * 3 + 3])) for band in range(3)]
+    bands = sorted(range(3), key=lambda band: band_keys[band])
+    orders = list()
+    for band_order in set(itertools.permutations(bands)):
+        if [band_keys[band] for band in band_order] != [band_keys[band] for band in bands]:
+            continue
+        for rows in itertools.product(*[band_row_orders(masks, band) for band in band_order]):
+            orders.append(rows[0] + rows[1] + rows[2])
+    return orders
+
+
+# (pattern key, [(row masks, column order)]) of the column transforms with the smallest pattern key, for one orientation.
+# Transforms with a key larger than bound (the best key of the other orientation) are left out
+def best_column_transforms(cells, bound=None):
+    # triplets[stack][p] = tuple of the 9 row triplets of stack with columns permuted by p
+    triplets = list()
+    for stack in range(3):
+        by_permutation = list()
+        for permuted in PERMUTED_TRIPLET:
+            by_permutation.append(tuple(permuted[(4 if cells[row * 9 + stack * 3] else 0)
+                                                 | (2 if cells[row * 9 + stack * 3 + 1] else 0)
+                                                 | (1 if cells[row * 9 + stack * 3 + 2] else 0)]
+                                        for row in range(9)))
+        triplets.append(by_permutation)
+
+    best_key = bound
+    best = list()
+    for stacks in PERMUTATIONS_3:
+        # permutations of the first stack with the smallest top bits first, to find a good bound early
+        for p0 in sorted(range(6), key=lambda p: min(triplets[stacks[0]][p])):
+            high = [triplet << 6 for triplet in triplets[stacks[0]][p0]]
+            # The first row of the key is the smallest row mask, it cannot be smaller than the smallest partial mask
+            if best_key is not None and min(high) > best_key[0][0]:
+                continue
+            for p1 in range(6):
+                middle = [h | (triplet << 3) for h, triplet in zip(high, triplets[stacks[1]][p1])]
+                if best_key is not None and min(middle) > best_key[0][0]:
+                    continue
+                for p2 in range(6):
+                    masks = [m | triplet for m, triplet in zip(middle, triplets[stacks[2]][p2])]
+                    if best_key is not None and min(masks) > best_key[0][0]:
+                        continue
+                    key = tuple(sorted([tuple(sorted(masks[0:3])), tuple(sorted(masks[3:6])), tuple(sorted(masks[6:9]))]))
+                    if best_key is None or key < best_key:
+                        best_key = key
+                        best = list()
+                    if key == best_key:
+                        col_order = tuple(stacks[k] * 3 + PERMUTATIONS_3[p][j]
+                                          for k, p in enumerate((p0, p1, p2)) for j in range(3))
+                        best.append((masks, col_order))
+    return best_key, best
+
+
+"""
+Canonical form of a 9x9 puzzle given as a flat list of 81 values (0 for blanks).
+Returns (canonical puzzle as an 81 character string, Transform taking the puzzle to it)
+"""
+def canonicalize(cells):
+    transposed_cells = [cells[col * 9 + row] for row in range(9) for col in range(9)]
+    best_key = None
+    candidates = list()  # (transposed, masks, col_order) tied on the pattern
+    for transposed, oriented in ((False, cells), (True, transposed_cells)):
+        key, best = best_column_transforms(oriented, best_key)
+        if not best:
+            continue
+        if best_key is None or key < best_key:
+            best_key = key
+            candidates = list()
+        if key == best_key:
+            candidates.extend((transposed, masks, col_order) for masks, col_order in best)
+
+    transforms = list()
+    for transposed, masks, col_order in candidates:
+        for row_order in row_orders(masks):
+            transforms.append(Transform(transposed, row_order, col_order, None))
+            if len(transforms) > max_tied_transforms:
+                transform = Transform(False, tuple(range(9)), tuple(range(9)), relabel_by_first_appearance(cells))
+                return "raw:" + "".join(str(value) for value in transform.apply(cells)), transform
+
+    best_form = None
+    best_transform = None
+    for transform in transforms:
+        ordered = [cells[index] for index in transform.source_indices()]
+        transform.digit_map = relabel_by_first_appearance(ordered)
+        form = "".join(str(transform.digit_map[value]) for value in ordered)
+        if best_form is None or form < best_form:
+            best_form = form
+            best_transform = transform
+    return best_form, best_transform
+
+
+"""
+Persistent LRU cache of solutions keyed by canonical puzzle form, stored as JSON in file_name (None keeps it in memory).
+Entries are kept least recently used first, the oldest are evicted past capacity.
+Written every save_every new solutions and on close. Use as a context manager
+"""
+class SolutionCache(object):
+    def __init__(self, file_name=None, capacity=default_capacity, save_every=default_save_every):
+        self.file_name = file_name
+        self.capacity = capacity
+        self.save_every = save_every
+        self.entries = OrderedDict()  # maps canonical puzzle to canonical solution (81 character strings)
+        self.unsaved = 0
+        self.hits = 0
+        self.misses = 0
+        self.last = None  # (flat puzzle, canonical form, transform) of the last lookup, reused by put
+        if file_name is not None and os.path.exists(file_name):
+            with open(file_name, 'r') as f:
+                for key, value in json.load(f)["entries"]:
+                    self.entries[key] = value
+            self.evict()
+
+    def canonicalize(self, puzzle):
+        cells = [value for row in puzzle for value in row]
+        if self.last is None or self.last[0] != cells:
+            self.last = (cells, ) + canonicalize(cells)
+        return self.last[1], self.last[2]
+
+    # Solution of puzzle (2D list) from the cache, None if it is not cached or not a 9x9 puzzle
+    def get(self, puzzle):
+        if len(puzzle) != 9:
+            return None
+        key, transform = self.canonicalize(puzzle)
+        value = self.entries.pop(key, None)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries[key] = value  # now most recently used
+        self.hits += 1
+        cells = transform.invert([int(char) for char in value])
+        return [cells[row * 9:(row + 1) * 9] for row in range(9)]
+
+    # Stores the solution (2D list) of puzzle. Incomplete solutions and grids other than 9x9 are not stored
+    def put(self, puzzle, solution):
+        if len(puzzle) != 9 or any(value == 0 for row in solution for value in row):
+            return
+        key, transform = self.canonicalize(puzzle)
+        self.entries.pop(key, None)
+        self.entries[key] = "".join(str(value) for value in transform.apply([value for row in solution for value in row]))
+        self.evict()
+        self.unsaved += 1
+        if self.unsaved >= self.save_every:
+            self.save()
+
+    def evict(self):
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    # Writes the cache file, through a temporary file so that an interrupted write keeps the previous one
+    def save(self):
+        self.unsaved = 0
+        if self.file_name is None:
+            return
+        temp_file_name = self.file_name + ".tmp"
+        with open(temp_file_name, 'w') as f:
+            json.dump({"entries": list(self.entries.items())}, f)
+        if hasattr(os, "replace"):
+            os.replace(temp_file_name, self.file_name)
+        else:  # Python 2, os.rename does not replace an existing file on Windows
+            if os.path.exists(self.file_name):
+                os.remove(self.file_name)
+            os.rename(temp_file_name, self.file_name)
+
+    def close(self):
+        if self.unsaved:
+            self.save()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,231 @@
+import os
+import sys
+import mmap
+
+"""
+Streaming Puzzle Corpus Reader/Writer
+Reads puzzles one at a time from large corpus files instead of loading them into memory, and writes
+solutions back out the same way.
+
+Line format: one puzzle per line, the N * N cells in row order (81 characters for a 9x9 grid).
+'0' or '.' is a blank, '1'..'9' are values, and 'A'..'P' are values 10..25 on 16x16 and 25x25 grids.
+Anything after the grid on a line (e.g. ",solution" or a rating) is ignored, as are empty lines,
+lines starting with '#' and a first line without any digits that is not a puzzle (a header). When solving, lines that are not a puzzle
+and puzzles that have no solution are reported on stderr with their line number and skipped.
+
+Grid file format (the test dirs): one puzzle per file, N lines of N space separated values, 0 for blanks.
+
+python Sudoku_Corpus.py input_corpus.txt output_corpus.txt [variant_num]
+Solves every puzzle of input_corpus.txt with the variant (numbered as in Sudoku_Experiments.solver_variants,
+defaults to 1) and writes one solution line per puzzle to output_corpus.txt
+"""
+
+BLANK_CHARS = "0."
+VALUE_CHARS = "123456789ABCDEFGHIJKLMNOP"  # VALUE_CHARS[v - 1] is the character of value v
+
+# Maps every character of the line format to its value, 0 for blanks
+VALUE_OF = dict((char, 0) for char in BLANK_CHARS)
+VALUE_OF.update((char, value) for value, char in enumerate(VALUE_CHARS, 1))
+VALUE_OF.update((char.lower(), value) for value, char in enumerate(VALUE_CHARS, 1) if char.isalpha())
+
+# Maps number of cells in a line to the side N of the grid
+SIZE_OF_LENGTH = dict((size * size, size) for size in (4, 9, 16, 25))
+
+flush_every = 1000  # solutions buffered by CorpusWriter before they are written out
+
+
+"""
+Iterates over the lines of a file as text, without reading the whole file.
+Regular files are memory-mapped, so the OS pages them in as they are read; pipes, stdin ('-')
+and empty files fall back to reading the file object line by line
+"""
+def iter_lines(file_name):
+    if file_name == "-":
+        for line in sys.stdin:
+            yield line
+        return
+    with open(file_name, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, mmap.error, OSError):  # empty file or not mappable
+            mapped = None
+        if mapped is None:
+            for line in f:
+                yield line.decode('ascii')
+            return
+        try:
+            line = mapped.readline()
+            while line:
+                yield line.decode('ascii')
+                line = mapped.readline()
+        finally:
+            mapped.close()
+
+
+# Parses the cells of one line into an N x N puzzle (2D list of integers). Raises ValueError if it is not a grid
+def parse_line(cells):
+    size = SIZE_OF_LENGTH.get(len(cells))
+    if size is None:
+        raise ValueError("Expected 16, 81, 256 or 625 cells, got {0}".format(len(cells)))
+    try:
+        values = [VALUE_OF[char] for char in cells]
+    except KeyError as e:
+        raise ValueError("Unexpected character {0!r}".format(e.args[0]))
+    if max(values) > size:
+        raise ValueError("Value {0} does not fit a {1}x{1} grid".format(max(values), size))
+    return [values[row * size:(row + 1) * size] for row in range(size)]
+
+
+# Grid cells of a corpus line: the first token before any separator
+def line_cells(line):
+    return line.strip().replace(",", " ").replace(";", " ").split(None, 1)[0]
+
+
+"""
+Generator of (line_number, puzzle) for every puzzle of a line format corpus file, line numbers are 1-based.
+Raises ValueError naming the line if a line is not a puzzle, or if on_error is given calls
+on_error(file_name, line_number, message) and skips the line
+"""
+def iter_puzzles(file_name, on_error=None):
+    for line_number, line in enumerate(iter_lines(file_name), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            puzzle = parse_line(line_cells(line))
+        except ValueError as e:
+            if line_number == 1 and not any(char.isdigit() for char in line):
+                continue  # header, e.g. "quizzes,solutions"
+            if on_error is None:
+                raise ValueError("{0}, line {1}: {2}".format(file_name, line_number, e))
+            on_error(file_name, line_number, str(e))
+            continue
+        yield line_number, puzzle
+
+
+# Line format of a puzzle, the inverse of parse_line. Blanks are written as '0'
+def format_line(puzzle):
+    return "".join(VALUE_CHARS[value - 1] if value else "0" for row in puzzle for value in row)
+
+
+"""
+Reads a single grid file (the test dir format) into an N x N puzzle, N is found from the number of values.
+Values are whitespace separated, lines of a 9x9 grid may also be written without spaces
+"""
+def read_grid_file(file_name):
+    with open(file_name, 'r') as f:
+        tokens = f.read().split()
+    if len(tokens) in SIZE_OF_LENGTH or (tokens and all(len(token) == 1 for token in tokens)):
+        values = [int(token) if token.isdigit() else VALUE_OF.get(token, -1) for token in tokens]
+    else:
+        values = [VALUE_OF.get(char, -1) for char in "".join(tokens)]  # 9 digits per line without spaces
+    size = SIZE_OF_LENGTH.get(len(values))
+    if size is None or min(values) < 0 or max(values) > size:
+        raise ValueError("{0} is not an N x N grid".format(file_name))
+    return [values[row * size:(row + 1) * size] for row in range(size)]
+
+
+# Writes a puzzle (or solution) as a grid file, in the format the solvers write their output in
+def write_grid_file(file_name, puzzle):
+    with open(file_name, 'w') as f:
+        for row in puzzle:
+            f.write("".join(str(value) + " " for value in row) + "\n")
+
+
+# Generator of (file_name, puzzle) for every grid file, one file open at a time
+def iter_grid_files(file_names):
+    for file_name in file_names:
+        yield file_name, read_grid_file(file_name)
+
+
+"""
+Writes puzzles (solutions) in the line format, one per line, as they are produced.
+Lines are buffered and written every flush_every puzzles, and on close. Use as a context manager
+"""
+class CorpusWriter(object):
+    def __init__(self, file_name):
+        self.f = sys.stdout if file_name == "-" else open(file_name, 'w')
+        self.buffer = list()
+        self.count = 0  # puzzles written
+
+    def write(self, puzzle):
+        self.buffer.append(format_line(puzzle))
+        self.count += 1
+        if len(self.buffer) >= flush_every:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.f.write("\n".join(self.buffer) + "\n")
+            self.buffer = list()
+        self.f.flush()
+
+    def close(self):
+        self.flush()
+        if self.f is not sys.stdout:
+            self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Writes a line that could not be read or solved to stderr, the default on_error of solve_puzzles
+def report_error(file_name, line_number, message):
+    sys.stderr.write("{0}, line {1}: {2}, skipped\n".format(file_name, line_number, message))
+
+
+"""
+Generator of (line_number, puzzle, solution) solving every puzzle of the corpus with solver_module.
+Lines that are not a puzzle and puzzles without a solution are passed to on_error(file_name, line_number, message)
+and skipped, so one bad line does not stop the run
+"""
+def solve_puzzles(file_name, solver_module, on_error=report_error, **kwargs):
+    devnull = open(os.devnull, 'w')  # solve prints its timing line for every puzzle
+    try:
+        for line_number, puzzle in iter_puzzles(file_name, on_error):
+            stdout = sys.stdout
+            sys.stdout = devnull
+            try:
+                solution = solver_module.Sudoku([row[:] for row in puzzle], **kwargs).solve()
+            finally:
+                sys.stdout = stdout
+            if any(0 in row for row in solution):  # solve returns the puzzle unfilled if it has no solution
+                on_error(file_name, line_number, "no solution")
+                continue
+            yield line_number, puzzle, solution
+    finally:
+        devnull.close()
+
+
+# Solves every puzzle of input_file_name, streaming the solutions to output_file_name. Returns the number solved
+def solve_corpus(input_file_name, output_file_name, solver_module, on_error=report_error, **kwargs):
+    with CorpusWriter(output_file_name) as writer:
+        for line_number, puzzle, solution in solve_puzzles(input_file_name, solver_module, on_error, **kwargs):
+            writer.write(solution)
+        return writer.count
+
+
+"""
+Generator of (line_number, puzzle, number of solutions) for every puzzle of the corpus, counted up to max_solutions
+(2 tells unique puzzles apart). solver_module needs the enumeration mode (Degree Heuristic or Value Ordering)
+"""
+def count_corpus_solutions(file_name, solver_module, max_solutions=2, **kwargs):
+    for line_number, puzzle in iter_puzzles(file_name):
+        sudoku = solver_module.Sudoku([row[:] for row in puzzle], **kwargs)
+        yield line_number, puzzle, sudoku.count_solutions(max_solutions)
+
+
+if __name__ == "__main__":
+    import time
+    import Sudoku_Experiments as Experiments
+    if len(sys.argv) not in (3, 4):
+        print("\nUsage: python Sudoku_Corpus.py input_corpus.txt output_corpus.txt [variant_num]\n")
+        raise ValueError("Wrong number of arguments!")
+    variant = Experiments.solver_variants[int(sys.argv[3]) if len(sys.argv) == 4 else 1]
+    start_time = time.time()
+    count = solve_corpus(sys.argv[1], sys.argv[2], variant)
+    sys.stderr.write("Solved {0} puzzles with {1} in {2:.1f} s\n".format(
+        count, variant.__name__, time.time() - start_time))
@@ -0,0 +1,227 @@
+import sys, copy, time
+from Sudoku_Tables import get_tables, box_size_of
+
+# Running script: given code can be run with the command:
+# python file.py, ./path/to/init_state.txt ./output/output.txt
+
+"""
+Dancing Links Variant
+Sudoku as an exact cover problem, solved with Knuth's Algorithm X on dancing links.
+Every (row, col, value) candidate is a row of the matrix covering 4 columns (constraints):
+    cell (row, col) is filled, row has value, col has value, 3x3 grid has value.
+An N x N grid has 4 * N * N columns and N * N * N rows (324 columns and 729 rows on a 9x9 grid).
+"""
+
+
+# Column headers (1-based, 0 is the root) of the 4 constraints satisfied by placing value at (row, col)
+def constraint_columns(row, col, value, tables=None):
+    tables = tables if tables is not None else get_tables()  # 9x9 tables by default
+    size = tables.size
+    num_cells = tables.num_cells
+    box = tables.box_of[row * size + col]
+    return (1 + row * size + col,
+            1 + num_cells + row * size + value - 1,
+            1 + 2 * num_cells + col * size + value - 1,
+            1 + 3 * num_cells + box * size + value - 1)
+
+
+"""
+Sparse 0/1 matrix as a toroidal doubly linked list.
+Nodes are indices into parallel lists (left/right/up/down links, column header, matrix row) instead of objects.
+Node 0 is the root, nodes 1..num_columns are the column headers.
+"""
+class DancingLinks(object):
+    def __init__(self, num_columns):
+        num_headers = num_columns + 1
+        self.left = [i - 1 for i in range(num_headers)]
+        self.left[0] = num_columns
+        self.right = [i + 1 for i in range(num_headers)]
+        self.right[num_columns] = 0
+        self.up = list(range(num_headers))
+        self.down = list(range(num_headers))
+        self.column = list(range(num_headers))  # column header of every node
+        self.size = [0] * num_headers  # number of nodes left in every column
+        self.row_of = [-1] * num_headers  # matrix row of every node, -1 for headers
+        self.first_node_of_row = dict()  # maps matrix row to its first node
+
+    def add_row(self, row_id, columns):
+        first = len(self.left)
+        last = first + len(columns) - 1
+        self.first_node_of_row[row_id] = first
+        for k, col in enumerate(columns):
+            node = first + k
+            self.left.append(node - 1 if node != first else last)
+            self.right.append(node + 1 if node != last else first)
+            # insert at the bottom of the column
+            self.up.append(self.up[col])
+            self.down.append(col)
+            self.down[self.up[col]] = node
+            self.up[col] = node
+            self.column.append(col)
+            self.row_of.append(row_id)
+            self.size[col] += 1
+
+    def cover(self, col):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[col]] = right[col]
+        left[right[col]] = left[col]
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, col):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[col]] = col
+        left[right[col]] = col
+
+    # Removes the columns satisfied by the given row, as if it was chosen
+    def select_row(self, row_id):
+        node = self.first_node_of_row[row_id]
+        self.cover(self.column[node])
+        j = self.right[node]
+        while j != node:
+            self.cover(self.column[j])
+            j = self.right[j]
+
+    def is_empty(self):
+        return self.right[0] == 0
+
+    # Column with the fewest rows left (S heuristic, the exact cover counterpart of MRV)
+    def choose_column(self):
+        right, size = self.right, self.size
+        best_col = right[0]
+        best_size = size[best_col]
+        col = right[best_col]
+        while col != 0 and best_size > 1:
+            if size[col] < best_size:
+                best_col = col
+                best_size = size[col]
+            col = right[col]
+        return best_col
+
+
+class Sudoku(object):
+    def __init__(self, puzzle):
+        self.puzzle = puzzle  # self.puzzle is a 2D List of Integers.
+        self.ans = copy.deepcopy(puzzle)  # self.ans is a 2D list of Integers. Will be returned to driver method for output
+        self.tables = get_tables(box_size_of(puzzle))  # puzzle is N x N, with N = box size * box size
+        self.dlx = DancingLinks(4 * self.tables.num_cells)
+        self.steps_taken = 0
+        self.time_taken = 0
+
+    # Matrix row id of placing value at (row, col) on an N x N grid
+    @staticmethod
+    def row_id(row, col, value, size=9):
+        return (row * size + col) * size + value - 1
+
+    # Builds the exact cover matrix and removes the constraints already satisfied by the given cells
+    def build_matrix(self):
+        size = self.tables.size
+        for row in range(0, size):
+            for col in range(0, size):
+                for value in range(1, size + 1):
+                    self.dlx.add_row(Sudoku.row_id(row, col, value, size), constraint_columns(row, col, value, self.tables))
+        for row in range(0, size):
+            for col in range(0, size):
+                if self.puzzle[row][col] != 0:
+                    self.dlx.select_row(Sudoku.row_id(row, col, self.puzzle[row][col], size))
+
+    # Algorithm X. Appends chosen matrix rows to solution, returns True once every column is covered
+    def search(self, solution):
+        dlx = self.dlx
+        if dlx.is_empty():
+            return True
+
+        self.steps_taken += 1
+
+        col = dlx.choose_column()
+        if dlx.size[col] == 0:
+            return False
+
+        right, left, down, column = dlx.right, dlx.left, dlx.down, dlx.column
+        dlx.cover(col)
+        r = down[col]
+        while r != col:
+            solution.append(dlx.row_of[r])
+            j = right[r]
+            while j != r:
+                dlx.cover(column[j])
+                j = right[j]
+
+            if self.search(solution):
+                return True  # SUCCESS SCENARIO, matrix is not restored
+
+            j = left[r]
+            while j != r:
+                dlx.uncover(column[j])
+                j = left[j]
+            solution.pop()
+            r = down[r]
+        dlx.uncover(col)
+        return False
+
+    def solve(self):
+        start_time = time.time()
+        self.build_matrix()
+        solution = list()
+        self.search(solution)
+        self.time_taken = (time.time() - start_time) * 1000
+        print("Dancing Links (Algorithm X) Variant: Time Taken (in ms) = {0}, Steps = {1}".format(self.time_taken, str(self.steps_taken)))
+
+        # Writing chosen rows to self.ans for output
+        for row_id in solution:
+            cell, value_index = divmod(row_id, self.tables.size)
+            (i, j) = self.tables.positions[cell]
+            self.ans[i][j] = value_index + 1
+
+        return self.ans
+
+
+if __name__ == "__main__":
+    # STRICTLY do NOT modify the code in the main function here
+    if len(sys.argv) != 3:
+        print("\nUsage: python CS3243_P2_Sudoku_XX.py input.txt output.txt\n")
+        raise ValueError("Wrong number of arguments!")
+
+    try:
+        f = open(sys.argv[1], 'r')
+    except IOError:
+        print("\nUsage: python CS3243_P2_Sudoku_XX.py input.txt output.txt\n")
+        raise IOError("Input file not found!")
+
+    puzzle = [[0 for i in range(9)] for j in range(9)]
+    lines = f.readlines()
+
+    i, j = 0, 0
+    for line in lines:
+        for number in line:
+            if '0' <= number <= '9':
+                puzzle[i][j] = int(number)
+                j += 1
+                if j == 9:
+                    i += 1
+                    j = 0
+
+    sudoku = Sudoku(puzzle)
+    ans = sudoku.solve()
+
+    with open(sys.argv[2], 'a') as f:
+        for i in range(9):
+            for j in range(9):
+                f.write(str(ans[i][j]) + " ")
+            f.write("\n")
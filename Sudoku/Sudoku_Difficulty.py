@@ -0,0 +1,210 @@
+import os
+import sys
+import csv
+import math
+import time
+import Sudoku_Experiments as Experiments
+import Sudoku_DegreeHeuristic as SudokuDegreeHeuristic
+import Sudoku_ValueOrdering as SudokuValueOrdering
+import Sudoku_DancingLinks as SudokuDancingLinks
+import Sudoku_Corpus as Corpus
+from Sudoku_Bitmask import get_bit_tables
+
+"""
+Puzzle Difficulty Estimator and Adaptive Strategy Selection
+analyze runs the initial domain reduction of the Degree Heuristic variant, then propagates naked and hidden
+singles on bitmask copies of the domains until nothing changes, without any search. From that it reports:
+    givens: number of given cells
+    domain_histogram: domain_histogram[k] = number of blank cells with k values left after the initial reduction
+    propagation_yield: fraction of the blank cells that singles propagation fills in
+    search_bits: log2 of the number of assignments left after propagation (0 if propagation solves the puzzle)
+    rating: EASY (solved by propagation), MEDIUM (search_bits below hard_search_bits) or HARD
+select_configuration picks the solver configuration for the rating. Puzzles that propagation mostly solves are
+cheapest with a light forward checking search; on the rest the exact cover search of Dancing Links wins by far.
+
+python Sudoku_Difficulty.py [csv_file_name]
+Validates the selector against the per-variant timings of the experiment CSV (Sudoku_Experiments.py output,
+experiments.csv by default): total time of the selected variants, analysis included, against every fixed
+variant and the per-puzzle best
+"""
+
+EASY = "easy"
+MEDIUM = "medium"
+HARD = "hard"
+
+# search_bits from which a puzzle that propagation does not solve is rated HARD. On the test dir inputs,
+# puzzles left with fewer bits are still solved fastest by forward checking
+hard_search_bits = 80
+
+# Solver configuration for every rating, (name, module, keyword arguments of Sudoku).
+# Names are the variant names of the experiment CSV columns, e.g. "Time Taken (VO Variant)"
+configurations = {
+    EASY: ("VO", SudokuValueOrdering, {}),
+    MEDIUM: ("VO", SudokuValueOrdering, {}),
+    HARD: ("DLX", SudokuDancingLinks, {}),
+}
+
+
+class DifficultyReport(object):
+    def __init__(self, givens, domain_histogram, decided, blanks, search_bits, consistent):
+        self.givens = givens
+        self.domain_histogram = domain_histogram
+        self.propagation_yield = float(decided) / blanks if blanks else 1.0
+        self.search_bits = search_bits
+        self.consistent = consistent  # False if propagation emptied a domain (the puzzle has no solution)
+        if not consistent or search_bits >= hard_search_bits:
+            self.rating = HARD  # an unsolvable puzzle is left to the search to prove
+        elif search_bits > 0:
+            self.rating = MEDIUM
+        else:
+            self.rating = EASY
+
+    def to_dict(self):
+        return {
+            "givens": self.givens,
+            "domain_histogram": self.domain_histogram,
+            "propagation_yield": self.propagation_yield,
+            "search_bits": self.search_bits,
+            "consistent": self.consistent,
+            "rating": self.rating,
+        }
+
+
+"""
+Naked and hidden singles on candidate masks (bit v - 1 for value v, 0 for filled cells) until a fixpoint.
+values (0 for blanks) and masks are updated in place.
+Returns the number of cells filled in, or None if a cell or a value of some unit has no candidate left
+"""
+def propagate_singles(values, masks, tables, bit_tables):
+    value_bit = bit_tables.value_bit
+    full_mask = bit_tables.full_mask
+    peers = tables.peers
+    decided = 0
+    changed = True
+    while changed:
+        changed = False
+        # Naked singles: cells with one candidate left
+        for index, mask in enumerate(masks):
+            if mask and not mask & (mask - 1):
+                value = mask.bit_length()
+                values[index] = value
+                masks[index] = 0
+                decided += 1
+                changed = True
+                for peer in peers[index]:
+                    if masks[peer] & mask:
+                        masks[peer] &= ~mask
+                        if not masks[peer]:
+                            return None
+        # Hidden singles: values with one possible cell left in a unit
+        for unit in tables.units:
+            once = 0
+            twice = 0
+            placed = 0
+            for index in unit:
+                mask = masks[index]
+                twice |= once & mask
+                once |= mask
+                placed |= value_bit[values[index]]
+            if (once | placed) != full_mask:
+                return None  # some value has no place left in the unit
+            hidden = once & ~twice & ~placed
+            while hidden:
+                bit = hidden & -hidden
+                hidden &= ~bit
+                for index in unit:
+                    if masks[index] & bit:
+                        masks[index] = bit  # filled in as a naked single on the next pass
+                        changed = True
+                        break
+    return decided
+
+
+# Estimates the difficulty of puzzle (2D list, 0 for blanks) without searching, returns a DifficultyReport
+def analyze(puzzle):
+    sudoku = SudokuDegreeHeuristic.Sudoku([row[:] for row in puzzle])
+    sudoku.initial_domain_reduction()
+    tables = sudoku.tables
+    bit_tables = get_bit_tables(tables.size)
+    value_bit = bit_tables.value_bit
+    values = list(sudoku.assignment.values)
+    masks = [0] * tables.num_cells
+    domain_histogram = [0] * (tables.size + 1)
+    blanks = 0
+    for var in sudoku.csp.variables:
+        if var is not None:
+            blanks += 1
+            domain_histogram[len(var.domain)] += 1
+            for value in var.domain:
+                masks[var.index] |= value_bit[value]
+
+    decided = propagate_singles(values, masks, tables, bit_tables)
+    if decided is None:
+        return DifficultyReport(tables.num_cells - blanks, domain_histogram, 0, blanks, 0.0, False)
+    popcount = bit_tables.popcount
+    search_bits = sum(math.log(popcount[mask], 2) for mask in masks if mask)
+    return DifficultyReport(tables.num_cells - blanks, domain_histogram, decided, blanks, search_bits, True)
+
+
+# Returns (DifficultyReport, (name, module, keyword arguments of Sudoku)) of the configuration picked for puzzle
+def select_configuration(puzzle):
+    report = analyze(puzzle)
+    return report, configurations[report.rating]
+
+
+# Solves puzzle with the configuration picked for it. Returns (name, solution, steps_taken, time_taken in ms)
+def solve_adaptive(puzzle):
+    report, (name, module, kwargs) = select_configuration(puzzle)
+    sudoku = module.Sudoku([row[:] for row in puzzle], **kwargs)
+    solution = sudoku.solve()
+    return name, solution, sudoku.steps_taken, sudoku.time_taken
+
+
+"""
+Replays the selector on the rows of the experiment CSV: the time of a puzzle is the CSV time of the variant
+selected for it plus the time taken by analyze. Prints the totals against every fixed variant and the
+per-puzzle best (oracle) of the CSV, and how often the selected variant was the fastest one
+"""
+def validate(csv_file_name):
+    with open(csv_file_name, 'r') as f:
+        rows = list(csv.DictReader(f))
+    if not rows:
+        raise ValueError("{0} has no rows".format(csv_file_name))
+    variant_names = [column[len("Time Taken ("):-len(" Variant)")] for column in Experiments.csv_header
+                     if column.startswith("Time Taken (")]
+    variant_totals = dict((name, 0.0) for name in variant_names)
+    rating_counts = dict((rating, 0) for rating in (EASY, MEDIUM, HARD))
+    selected_total = 0.0
+    analysis_total = 0.0
+    oracle_total = 0.0
+    fastest_picks = 0
+    for row in rows:
+        puzzle = Corpus.read_grid_file(os.path.join(Experiments.test_dir, row["Test File Name"]))
+        start_time = time.time()
+        report, (name, module, kwargs) = select_configuration(puzzle)
+        analysis_total += (time.time() - start_time) * 1000
+        rating_counts[report.rating] += 1
+        times = dict((variant_name, float(row["Time Taken ({0} Variant)".format(variant_name)]))
+                     for variant_name in variant_names)
+        for variant_name in variant_names:
+            variant_totals[variant_name] += times[variant_name]
+        selected_total += times[name]
+        oracle_total += min(times.values())
+        if times[name] == min(times.values()):
+            fastest_picks += 1
+
+    print("Selector on {0} puzzles of {1}: {2}".format(len(rows), csv_file_name, ", ".join(
+        "{0} = {1}".format(rating, rating_counts[rating]) for rating in (EASY, MEDIUM, HARD))))
+    for variant_name in variant_names:
+        print("{0:<10} total = {1:10.1f} ms".format(variant_name, variant_totals[variant_name]))
+    print("{0:<10} total = {1:10.1f} ms ({2:.1f} ms solving + {3:.1f} ms analysis), fastest variant picked on "
+          "{4}/{5} puzzles".format("Selector", selected_total + analysis_total, selected_total, analysis_total,
+                                   fastest_picks, len(rows)))
+    print("{0:<10} total = {1:10.1f} ms".format("Oracle", oracle_total))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print("\nUsage: python Sudoku_Difficulty.py [csv_file_name]\n")
+        raise ValueError("Wrong number of arguments!")
+    validate(sys.argv[1] if len(sys.argv) > 1 else Experiments.csv_file_name)
@@ -0,0 +1,919 @@
+import copy, time
+from array import array
+from collections import deque, OrderedDict
+from Sudoku_Tables import get_tables, box_size_of, PositionView
+
+"""
+Search engine shared by the CSP variants (Sudoku_DegreeHeuristic, Sudoku_ValueOrdering): variables, assignment,
+MRV index, trail, propagation (forward checking, AC-3/MAC, rules) and the backtracking searches.
+A variant subclasses Sudoku for the order values are tried in, and CSP for how MRV ties are broken
+"""
+
+# Propagation modes, selected with Sudoku(puzzle, propagation=...)
+FORWARD_CHECKING = "fc"  # forward checking only during search (default)
+AC3_PREPROCESSING = "ac3"  # AC-3 once after initial_domain_reduction, forward checking during search
+MAC = "mac"  # AC-3 as pre-processing, then Maintained Arc Consistency after every assignment during search
+PROPAGATION_MODES = (FORWARD_CHECKING, AC3_PREPROCESSING, MAC)
+
+"""
+Represents a cell in the Sudoku Space.
+Maintains Domain of the Variable, its current coordiation position
+Cells are identified by their flat index (row * N + col) on an N x N grid, see Sudoku_Tables
+"""
+class Variable(object):
+    def __init__(self, index, tables=None):
+        tables = tables if tables is not None else get_tables()  # 9x9 tables by default
+        self.index = index  # flat index of the cell
+        self.position_tuple = tables.positions[index]  # position is a tuple (i, j) representing i-j coordinates
+        self.domain = set(range(1, tables.size + 1))  # domain of variable is from 1..N incl. initially
+        self.neighbours = set()  # set of flat indices that it has arc consistency with (rows/cols/grid)
+
+    # Remove all items in elements_to_remove (a set) from this variable's domain.
+    # Builds a new set: the iteration order of a set depends on how it was built, and it is the order values are tried in
+    def reduce_domain(self, elements_to_remove):
+        self.domain = self.domain.difference(elements_to_remove)
+
+    # remove a value from the domain. Called by AC3
+    def remove_from_domain(self, value):
+        self.domain.remove(value)
+
+    def add_value_to_domain(self, value):
+        self.domain.add(value)
+
+    def domain_empty(self):
+        return len(self.domain) == 0
+
+    def add_neighbours(self, index):
+        self.neighbours.add(index)
+
+    def __lt__(self, other):  # override less-than method
+        return len(self.domain) < len(other.domain)
+
+    def __gt__(self, other):  # override greater-than method
+        return len(self.domain) > len(other.domain)
+
+    def __eq__(self, other):
+        return len(self.domain) == len(other.domain)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __str__(self):
+        return str(self.position_tuple)
+
+
+"""
+Assignment represents the state of the current CSP assignment.
+Keeps an occupancy mask (bit v set if value v is used) per row, column and grid for consistency checks.
+If number of unassigned variables = 0, it is complete
+"""
+class Assignment(object):
+    def __init__(self, list_of_cells, tables=None):
+        self.tables = tables if tables is not None else get_tables(box_size_of(list_of_cells))
+        self.row_of = self.tables.row_of
+        self.col_of = self.tables.col_of
+        self.box_of = self.tables.box_of
+        size = self.tables.size
+        self.values = array('b', [0] * self.tables.num_cells)  # maps flat index to a value, 0 means unassigned
+        self.row_masks = [0] * size
+        self.col_masks = [0] * size
+        self.box_masks = [0] * size
+        # Initialise the assignments from list of cells (2D array) given
+        num_of_fixed_values = 0  # counting number of unassigned variables left
+        for i in range(0, len(list_of_cells)):
+            for j in range(0, len(list_of_cells[0])):
+                curr_variable = list_of_cells[i][j]
+
+                if curr_variable != 0:  # not 0 means variable has been assigned
+                    num_of_fixed_values += 1
+                    self.occupy(i * size + j, curr_variable)
+        self.unassigned_count = self.tables.num_cells - num_of_fixed_values
+
+    # (i, j) view of values for older callers, maps tuple (i, j) to a value. Writing through it skips the masks
+    @property
+    def assignment_dict(self):
+        return PositionView(self.values, self.tables)
+
+    def is_complete(self):
+        return self.unassigned_count == 0
+
+    # Places value at index and marks it used in the row, column and grid of index
+    def occupy(self, index, value):
+        bit = 1 << value
+        self.values[index] = value
+        self.row_masks[self.row_of[index]] |= bit
+        self.col_masks[self.col_of[index]] |= bit
+        self.box_masks[self.box_of[index]] |= bit
+
+    def assign(self, index, value):
+        self.occupy(index, value)
+        self.unassigned_count -= 1
+
+    def reset(self, index):
+        value = self.values[index]
+        if value != 0:
+            bit = ~(1 << value)
+            self.values[index] = 0
+            self.row_masks[self.row_of[index]] &= bit
+            self.col_masks[self.col_of[index]] &= bit
+            self.box_masks[self.box_of[index]] &= bit
+            self.unassigned_count += 1
+
+    # value is consistent if it is not used yet in the row, column and grid of index
+    def is_consistent_with(self, index, value):
+        return not ((self.row_masks[self.row_of[index]] | self.col_masks[self.col_of[index]]
+                     | self.box_masks[self.box_of[index]]) & (1 << value))
+
+
+"""
+Bucketed priority structure used for MRV selection.
+Unassigned variables are kept in buckets[domain size][degree], so the next variable is found by
+walking at most (N + 1) x (peers + 1) buckets (10 x 21 on a 9x9 grid) instead of scanning every unassigned variable.
+Domain sizes and degrees are updated incrementally as domains shrink/grow and variables are (un)assigned.
+Ties are broken as the scan over the unassigned variables did: the variable added to the index last wins, i.e. the
+last one in index order, except that a variable put back on backtracking goes after all the others
+"""
+class MRVIndex(object):
+    def __init__(self, max_domain_size=9, max_degree=20, num_cells=81):
+        self.buckets = [[set() for _ in range(max_degree + 1)] for _ in range(max_domain_size + 1)]
+        self.bucket_sizes = [0] * (max_domain_size + 1)  # number of indexed variables per domain size
+        self.domain_size = [-1] * num_cells  # maps flat index to its domain size, -1 if the variable is not indexed
+        self.degree = [0] * num_cells  # maps flat index to its number of unassigned neighbours, kept for all variables
+        self.added_at = [0] * num_cells  # maps flat index to when it was last added, for breaking ties
+        self.clock = 0
+
+    def add(self, index, domain_size, degree=None):
+        if degree is not None:
+            self.degree[index] = degree
+        self.domain_size[index] = domain_size
+        self.clock += 1
+        self.added_at[index] = self.clock
+        self.buckets[domain_size][self.degree[index]].add(index)
+        self.bucket_sizes[domain_size] += 1
+
+    def remove(self, index):
+        domain_size = self.domain_size[index]
+        self.domain_size[index] = -1
+        self.buckets[domain_size][self.degree[index]].remove(index)
+        self.bucket_sizes[domain_size] -= 1
+
+    def update_domain_size(self, index, domain_size):
+        old_domain_size = self.domain_size[index]
+        degree = self.degree[index]
+        self.buckets[old_domain_size][degree].remove(index)
+        self.bucket_sizes[old_domain_size] -= 1
+        self.buckets[domain_size][degree].add(index)
+        self.bucket_sizes[domain_size] += 1
+        self.domain_size[index] = domain_size
+
+    # Degree of variables not in the index (assigned) is still tracked, for when they are added back
+    def update_degree(self, index, delta):
+        degree = self.degree[index]
+        self.degree[index] = degree + delta
+        if self.domain_size[index] != -1:
+            buckets = self.buckets[self.domain_size[index]]
+            buckets[degree].remove(index)
+            buckets[degree + delta].add(index)
+
+    # Returns flat index with the smallest domain (ties broken by largest degree, then added last), None if index is empty
+    def select(self):
+        for domain_size in range(len(self.bucket_sizes)):
+            if self.bucket_sizes[domain_size]:
+                for bucket in reversed(self.buckets[domain_size]):
+                    if bucket:
+                        return max(bucket, key=self.added_at.__getitem__)
+        return None
+
+
+"""
+Single undo stack shared by the whole search.
+Every change made during search (a value removed from a domain, a variable assigned) is pushed on the trail.
+Backtracking takes a checkpoint before trying a value and rolls back to it, instead of every node
+keeping its own set of changed positions.
+"""
+class Trail(object):
+    DOMAIN_REMOVAL = 0
+    ASSIGNMENT = 1
+
+    def __init__(self, csp, assignment):
+        self.csp = csp
+        self.assignment = assignment
+        self.entries = []  # stack of (kind, flat index, value)
+
+    def push_removal(self, index, value):
+        self.entries.append((Trail.DOMAIN_REMOVAL, index, value))
+
+    def push_assignment(self, index, value):
+        self.entries.append((Trail.ASSIGNMENT, index, value))
+
+    def checkpoint(self):
+        return len(self.entries)
+
+    # Undo every change made since checkpoint, most recent first
+    def rollback(self, checkpoint):
+        entries = self.entries
+        while len(entries) > checkpoint:
+            kind, index, value = entries.pop()
+            if kind == Trail.DOMAIN_REMOVAL:
+                self.csp.restore_value(index, value)
+            else:
+                self.assignment.reset(index)
+                self.csp.restore_variable(self.csp.variables[index])
+
+
+default_nogood_capacity = 1000  # nogoods kept by a NogoodStore, least recently used are evicted
+default_max_nogood_size = 4  # larger conflict sets are not stored, they rarely recur and are slow to check
+
+
+"""
+Bounded store of nogoods for conflict-directed backjumping: sets of (index, value) assignments that cannot all
+hold in a solution. Kept least recently used first, the oldest are evicted past capacity. Every nogood is
+indexed by each of its assignments, so an assignment only checks the nogoods it could complete.
+Nogoods hold for the puzzle they were found on only, every Sudoku object has its own store
+"""
+class NogoodStore(object):
+    def __init__(self, capacity=default_nogood_capacity, max_size=default_max_nogood_size):
+        self.capacity = capacity
+        self.max_size = max_size
+        self.nogoods = OrderedDict()  # maps nogood (frozenset of (index, value)) to None, least recently used first
+        self.by_assignment = dict()  # maps (index, value) to {nogood containing it: the other assignments of nogood}
+        self.hits = 0  # assignments failed because they completed a stored nogood
+
+    def add(self, nogood):
+        if len(nogood) > self.max_size or nogood in self.nogoods:
+            return
+        self.nogoods[nogood] = None
+        for item in nogood:
+            self.by_assignment.setdefault(item, dict())[nogood] = tuple(other for other in nogood if other != item)
+        while len(self.nogoods) > self.capacity:
+            self.unindex(self.nogoods.popitem(last=False)[0])
+
+    def unindex(self, nogood):
+        for item in nogood:
+            holders = self.by_assignment[item]
+            del holders[nogood]
+            if not holders:
+                del self.by_assignment[item]
+
+    # Stored nogood completed by assigning value at index (values holds the assignment), None if there is none
+    def find_violated(self, index, value, values):
+        holders = self.by_assignment.get((index, value))
+        if holders:
+            for nogood, others in holders.items():
+                for other, other_value in others:
+                    if values[other] != other_value:
+                        break
+                else:
+                    del self.nogoods[nogood]
+                    self.nogoods[nogood] = None  # now most recently used
+                    self.hits += 1
+                    return nogood
+        return None
+
+    def __len__(self):
+        return len(self.nogoods)
+
+
+"""
+Rule-based propagation on the unit structure (rows, columns, grids), applied between backtrack steps.
+Rules are pluggable: Sudoku(puzzle, rules=[...]) takes any list of PropagationRule objects.
+apply is given the unassigned variables and the placed values of one unit, prunes values through
+Sudoku.prune (so they are recorded on the trail) and returns the number of values removed,
+or None if the unit can no longer be completed.
+fired counts the number of times a rule removed something from a unit
+"""
+class PropagationRule(object):
+    name = "Rule"
+
+    def __init__(self):
+        self.fired = 0
+        self.values_removed = 0
+
+    def apply(self, sudoku, unit_vars, placed_values):
+        raise NotImplementedError
+
+
+# A cell with a single value left: no other cell in the unit can take that value
+class NakedSingleRule(PropagationRule):
+    name = "Naked Single"
+
+    def apply(self, sudoku, unit_vars, placed_values):
+        removed = 0
+        for var in unit_vars:
+            if len(var.domain) == 1:
+                value = next(iter(var.domain))
+                for other in unit_vars:
+                    if other is not var and value in other.domain:
+                        sudoku.prune(other.index, value)
+                        removed += 1
+                        if other.domain_empty():
+                            return None
+        return removed
+
+
+# A value that fits in only one cell of the unit must go there
+class HiddenSingleRule(PropagationRule):
+    name = "Hidden Single"
+
+    def apply(self, sudoku, unit_vars, placed_values):
+        removed = 0
+        for value in range(1, sudoku.tables.size + 1):
+            if value in placed_values:
+                continue
+            holders = [var for var in unit_vars if value in var.domain]
+            if len(holders) == 0:
+                return None
+            if len(holders) == 1 and len(holders[0].domain) > 1:
+                var = holders[0]
+                for other_value in list(var.domain):
+                    if other_value != value:
+                        sudoku.prune(var.index, other_value)
+                        removed += 1
+        return removed
+
+
+# Two cells with the same two values left: no other cell in the unit can take either value
+class NakedPairRule(PropagationRule):
+    name = "Naked Pair"
+
+    def apply(self, sudoku, unit_vars, placed_values):
+        removed = 0
+        pairs = dict()  # maps sorted tuple of the 2 values to the variables with exactly that domain
+        for var in unit_vars:
+            if len(var.domain) == 2:
+                pairs.setdefault(tuple(sorted(var.domain)), []).append(var)
+        for pair, pair_vars in pairs.items():
+            if len(pair_vars) > 2:  # 3 cells sharing 2 values
+                return None
+            if len(pair_vars) == 2:
+                for other in unit_vars:
+                    if other is pair_vars[0] or other is pair_vars[1]:
+                        continue
+                    for value in pair:
+                        if value in other.domain:
+                            sudoku.prune(other.index, value)
+                            removed += 1
+                            if other.domain_empty():
+                                return None
+        return removed
+
+
+# Two values that only fit in the same two cells: those cells can take no other value
+class HiddenPairRule(PropagationRule):
+    name = "Hidden Pair"
+
+    def apply(self, sudoku, unit_vars, placed_values):
+        removed = 0
+        values_of_holders = dict()  # maps the flat indices of the 2 variables holding a value to the values they hold
+        for value in range(1, sudoku.tables.size + 1):
+            if value in placed_values:
+                continue
+            holders = tuple(var.index for var in unit_vars if value in var.domain)
+            if len(holders) == 2:
+                values_of_holders.setdefault(holders, []).append(value)
+        for holders, values in values_of_holders.items():
+            if len(values) > 2:  # 3 values sharing 2 cells
+                return None
+            if len(values) == 2:
+                for index in holders:
+                    for other_value in list(sudoku.csp.domains[index]):
+                        if other_value not in values:
+                            sudoku.prune(index, other_value)
+                            removed += 1
+        return removed
+
+
+# Fresh instances of every rule, in the order they are applied
+def default_rules():
+    return [NakedSingleRule(), HiddenSingleRule(), NakedPairRule(), HiddenPairRule()]
+
+
+"""
+Encapsulates all variables that needs to be assigned
+Single Instance only - stored as an attribute in Sudoku Object
+Does not break MRV ties by degree, every variable has degree 0 in the MRV index. A variant that does overrides
+build_mrv_index, remove_variable and restore_variable
+"""
+class CSP(object):
+    def __init__(self, list_of_cells, tables=None):
+        self.tables = tables if tables is not None else get_tables(box_size_of(list_of_cells))
+        size = self.tables.size
+        self.variables = [None] * self.tables.num_cells  # maps flat index to a Variable object, None for given cells. Never shrinks
+        self.domains = [None] * self.tables.num_cells  # maps flat index to the domain of its Variable (the same set object)
+        for i in range(0, size):
+            for j in range(0, size):
+                if list_of_cells[i][j] == 0:  # 0 means unassigned initially, is a variable to consider
+                    var = Variable(i * size + j, self.tables)
+                    self.variables[var.index] = var
+                    self.domains[var.index] = var.domain
+        self.mrv_index = None  # built by build_mrv_index once domains and neighbours are known
+        self.units = self.tables.units  # the rows, columns and grids, each a tuple of the N flat indices in it
+
+    # (i, j) view of variables for older callers, maps tuple (i, j) to a Variable object
+    @property
+    def unassigned_dict(self):
+        return PositionView(self.variables, self.tables)
+
+    def size(self):
+        return sum(1 for var in self.variables if var is not None)
+
+    def get_variable(self, index):
+        return self.variables[index]
+
+    """
+    Pre-processing Step to add
+    """
+    def gen_binary_constraints(self):
+        # Neighbours are the peers (same row/col/grid) that are also unassigned, hence common arc
+        # A set of flat indices iterates in index order, whereas the (i, j) tuple sets it replaced iterated in hash order.
+        # That order decides which domains forward checking prunes before a wipeout, and so the order values are tried
+        # in after backtracking: steps taken on some hard puzzles differ slightly from the tuple version
+        for var in self.variables:
+            if var is not None:
+                for peer in self.tables.peers[var.index]:
+                    if self.variables[peer] is not None:
+                        var.add_neighbours(peer)
+
+    def get_neighbours_of_cell(self, cell):
+        return self.variables[cell].neighbours  # set of flat indices
+
+    # Builds the MRV index, variables are bucketed by domain size only
+    def build_mrv_index(self):
+        self.mrv_index = MRVIndex(self.tables.size, 0, self.tables.num_cells)
+        for var in self.variables:
+            if var is not None:
+                self.mrv_index.add(var.index, len(var.domain), 0)
+
+    # Removes value from the domain of the variable at index, keeping the MRV index up to date
+    def remove_value(self, index, value):
+        domain = self.domains[index]
+        domain.remove(value)
+        self.mrv_index.update_domain_size(index, len(domain))
+
+    def restore_value(self, index, value):
+        domain = self.domains[index]
+        domain.add(value)
+        self.mrv_index.update_domain_size(index, len(domain))
+
+    # Takes var out of the unassigned variables
+    def remove_variable(self, var):
+        self.mrv_index.remove(var.index)
+
+    def restore_variable(self, var):
+        self.mrv_index.add(var.index, len(var.domain))
+
+
+"""
+Search shared by the CSP variants. A variant sets name (printed by solve) and csp_class, and defines
+order_domain_values
+"""
+class Sudoku(object):
+    name = "Inference + MRV"
+    csp_class = CSP
+
+    def __init__(self, puzzle, propagation=FORWARD_CHECKING, rules=None, cache=None, instrumentation=None, iterative=True,
+                 backjumping=False, nogood_capacity=0):
+        if propagation not in PROPAGATION_MODES:
+            raise ValueError("Unknown propagation mode: {0}".format(propagation))
+        if nogood_capacity and not backjumping:
+            raise ValueError("Nogood learning needs backjumping")
+        if backjumping and (propagation == MAC or rules):
+            # Conflict sets only account for the values forward checking removes
+            raise ValueError("Backjumping works with forward checking only, without MAC or rules")
+        self.propagation = propagation
+        self.rules = rules if rules is not None else []  # PropagationRule objects, e.g. default_rules()
+        self.cache = cache  # solution cache checked before searching, e.g. Sudoku_Cache.SolutionCache
+        self.tables = get_tables(box_size_of(puzzle))  # puzzle is N x N, with N = box size * box size
+        self.puzzle = puzzle  # self.puzzle is a 2D List of Integers.
+        self.ans = copy.deepcopy(puzzle)  # self.ans is a 2D list of Integers. Will be returned to driver method for output
+        self.assignment = Assignment(puzzle, self.tables)  # initialize assignment based on given input
+        self.csp = self.csp_class(puzzle, self.tables)
+        self.trail = Trail(self.csp, self.assignment)  # undo stack for every change made during search
+        self.steps_taken = 0
+        self.time_taken = 0
+        self.iterative = iterative  # explicit stack search (iterative_backtrack) instead of recursive backtrack
+        self.search_stack = []  # frames of iterative_backtrack, kept between calls so that a paused search can resume
+        self.search_expand = True  # iterative_backtrack resumes by expanding a new node
+        self.search_prepared = False  # pre-processing done by search
+        self.on_frame_exhausted = None  # called with (depth, index) when every value of a frame failed
+        self.backjumping = backjumping  # solve searches with backjumping_backtrack (forward checking only)
+        # NogoodStore of backjumping_backtrack, e.g. nogood_capacity=default_nogood_capacity. 0 learns no nogoods
+        self.nogoods = NogoodStore(nogood_capacity) if nogood_capacity else None
+        self.depth_of = None  # built by backjumping_backtrack
+        self.initial_domains = None  # domains after pre-processing, built by backjumping_backtrack
+        self.wiped_out = None  # flat index of the domain emptied by the last failed inference
+        self.instrumentation = instrumentation  # e.g. Sudoku_Instrumentation.Instrumentation, None adds no overhead
+        if instrumentation is not None:
+            instrumentation.attach(self)
+
+    # Use MRV Minimum Remaining Values Heuristic to select variable
+    # Finding variable with the smallest domain
+    # Returns Variable object corresponding to position with MRV
+    def select_unassigned_variable(self):
+        # MRV index keeps variables bucketed by domain size (and degree, if the variant's CSP tracks it)
+        min_variable_key = self.csp.mrv_index.select()
+        mrv_variable = self.csp.variables[min_variable_key]
+        return mrv_variable
+
+    """
+    Inference is forward checking only.
+    Removes value from the domains of var's unassigned neighbours, recording every removal on the trail.
+    If some domain of its neighbour is reduced to an empty set, then current value to variable assignment is illegal,
+    will return False (caller rolls back the trail). Else, will return True
+    """
+    def inference(self, csp, var, value):
+        values = self.assignment.values
+        domains = csp.domains
+        for neighbour in var.neighbours:
+            if values[neighbour] == 0:  # skip neighbours that are already assigned
+                neighbour_domain = domains[neighbour]
+                if value in neighbour_domain:
+                    csp.remove_value(neighbour, value)
+                    self.trail.push_removal(neighbour, value)
+                    if not neighbour_domain:
+                        self.wiped_out = neighbour
+                        return False
+
+        if self.propagation == MAC:
+            # Neighbours left with a single value force that value out of their own neighbours' domains
+            queue = list()
+            for neighbour in var.neighbours:
+                if values[neighbour] == 0 and len(domains[neighbour]) == 1:
+                    queue.extend(self.arcs_into(csp, neighbour))
+            return self.arc_consistency(csp, queue)
+        return True
+
+    # Arcs (Xk, Xj) for every unassigned neighbour Xk of Xj
+    def arcs_into(self, csp, index_j):
+        values = self.assignment.values
+        return [(index_k, index_j) for index_k in csp.variables[index_j].neighbours if values[index_k] == 0]
+
+    """
+    Revise arc (Xi, Xj) of the "not equal" constraint: a value v of Xi has no support in Xj only if Dj = {v}.
+    Returns True if Di was reduced (removal is recorded on the trail)
+    """
+    def revise(self, csp, index_i, index_j):
+        domain_j = csp.domains[index_j]
+        if len(domain_j) == 1:
+            value = next(iter(domain_j))
+            if value in csp.domains[index_i]:
+                self.prune(index_i, value)
+                return True
+        return False
+
+    """
+    Queue-based AC-3 over the neighbour graph built by CSP.gen_binary_constraints.
+    Only arcs between unassigned variables are revised. As revising (Xk, Xi) can only remove something once
+    Di is a singleton, arcs into Xi are queued again only when Xi is reduced to a single value.
+    Returns False if some domain is wiped out, else True
+    """
+    def arc_consistency(self, csp, arcs):
+        values = self.assignment.values
+        queue = deque(arcs)
+        queued = set(arcs)
+        while queue:
+            arc = queue.popleft()
+            queued.discard(arc)
+            index_i, index_j = arc
+            if values[index_i] != 0 or values[index_j] != 0:
+                continue
+            if self.revise(csp, index_i, index_j):
+                domain_i = csp.domains[index_i]
+                if len(domain_i) == 0:
+                    return False
+                if len(domain_i) == 1:
+                    for new_arc in self.arcs_into(csp, index_i):
+                        if new_arc not in queued and new_arc[0] != index_j:
+                            queue.append(new_arc)
+                            queued.add(new_arc)
+        return True
+
+    # Removes value from the domain of the variable at index, recording it on the trail
+    def prune(self, index, value):
+        self.csp.remove_value(index, value)
+        self.trail.push_removal(index, value)
+
+    """
+    Applies the rules until none of them can remove anything more.
+    Only units containing a cell changed on the trail since checkpoint are looked at, then the units touched by
+    those rules' own removals, and so on. With checkpoint None every unit is looked at first (pre-processing).
+    Returns False if a rule found a unit that can no longer be completed, else True
+    """
+    def apply_rules(self, csp, checkpoint=None):
+        if not self.rules:
+            return True
+        values = self.assignment.values
+        units_of = self.tables.units_of
+        entries = self.trail.entries
+        if checkpoint is None:
+            dirty_units = range(len(csp.units))
+        else:
+            dirty_units = set()
+            for k in range(checkpoint, len(entries)):
+                dirty_units.update(units_of[entries[k][1]])
+        while dirty_units:
+            scanned = len(entries)
+            for unit_index in dirty_units:
+                unit_vars = list()
+                placed_values = set()
+                for index in csp.units[unit_index]:
+                    if values[index] == 0:
+                        unit_vars.append(csp.variables[index])
+                    else:
+                        placed_values.add(values[index])
+                for rule in self.rules:
+                    removed = rule.apply(self, unit_vars, placed_values)
+                    if removed is None:
+                        return False
+                    if removed:
+                        rule.fired += 1
+                        rule.values_removed += removed
+            dirty_units = set()
+            for k in range(scanned, len(entries)):
+                dirty_units.update(units_of[entries[k][1]])
+        return True
+
+    # Maps rule name to how many times it fired
+    def rule_stats(self):
+        return dict((rule.name, rule.fired) for rule in self.rules)
+
+    # Assigns value to var, recording it on the trail so that rollback undoes it
+    def assign(self, var, value):
+        self.assignment.assign(var.index, value)
+        self.csp.remove_variable(var)
+        self.trail.push_assignment(var.index, value)
+
+    # Values of var in the order they are tried, defined by each variant
+    def order_domain_values(self, var, assignment, csp):
+        raise NotImplementedError
+
+    def backtrack(self, assignment, csp):
+        if assignment.is_complete():
+            return assignment
+
+        self.steps_taken += 1
+
+        curr_var = self.select_unassigned_variable()  # Returns a Variable object
+        # x is an integer value from domain of curr_var
+        for x in self.order_domain_values(curr_var, assignment, csp):
+            if assignment.is_consistent_with(curr_var.index, x):
+                checkpoint = self.trail.checkpoint()
+                self.assign(curr_var, x)
+                if self.inference(csp, curr_var, x) and self.apply_rules(csp, checkpoint):
+                    result = self.backtrack(assignment, csp)
+                    # SUCCESS SCENARIO
+                    if result != False:
+                        return result
+
+                # Failure in this x value or one of its sub-trees, undo assignment and domain reduction
+                self.trail.rollback(checkpoint)
+        return False
+
+    """
+    Same search as backtrack (same nodes, same order of values, same steps_taken) with an explicit stack of frames
+    instead of recursion, so deep boards cannot hit the recursion limit and the search can stop and resume.
+    Every frame is [var, iterator over the values left to try, checkpoint of the value being tried].
+    Expands at most max_steps more nodes (None for no limit).
+    Returns the assignment if complete, False if there is no solution, or None if paused (call again to resume).
+    Called again after a complete assignment, the search carries on to the next solution
+    """
+    def iterative_backtrack(self, assignment, csp, max_steps=None):
+        stack = self.search_stack
+        trail = self.trail
+        on_frame_exhausted = self.on_frame_exhausted
+        step_limit = self.steps_taken + max_steps if max_steps is not None else None
+        expand = self.search_expand
+        if not expand and not stack:
+            return False  # every solution has been returned already
+        while True:
+            if expand:
+                if assignment.is_complete():
+                    self.search_expand = False  # resumes by trying the next value of the last frame
+                    return assignment
+                if step_limit is not None and self.steps_taken >= step_limit:
+                    self.search_expand = True
+                    return None
+
+                self.steps_taken += 1
+                var = self.select_unassigned_variable()  # Returns a Variable object
+                stack.append([var, iter(self.order_domain_values(var, assignment, csp)), None])
+
+            frame = stack[-1]
+            var, values, checkpoint = frame
+            if checkpoint is not None:
+                # Failure in the sub-tree of the value tried last, undo assignment and domain reduction
+                trail.rollback(checkpoint)
+            expand = False
+            # x is an integer value from domain of var, the iterator carries on from the value tried last
+            for x in values:
+                if assignment.is_consistent_with(var.index, x):
+                    checkpoint = trail.checkpoint()
+                    self.assign(var, x)
+                    if self.inference(csp, var, x) and self.apply_rules(csp, checkpoint):
+                        expand = True
+                        break
+                    trail.rollback(checkpoint)
+
+            if expand:
+                frame[2] = checkpoint
+            else:
+                stack.pop()
+                if on_frame_exhausted is not None:
+                    on_frame_exhausted(len(stack) + 1, var.index)
+                if not stack:
+                    self.search_expand = False
+                    return False
+
+    """
+    Depths (in the backjumping stack) of the assignments that removed values from the domain of the variable
+    at index. Forward checking removes value v when a neighbour is assigned v, the earliest such neighbour is blamed.
+    Values missing from initial_domains were removed by pre-processing, on account of the given cells only
+    """
+    def culprits(self, index):
+        values = self.assignment.values
+        depth_of = self.depth_of
+        initial_domain = self.initial_domains[index]
+        blamed = dict()  # maps value to the depth of the earliest assigned neighbour holding it
+        for neighbour in self.csp.variables[index].neighbours:
+            depth = depth_of[neighbour]
+            if depth >= 0:
+                value = values[neighbour]
+                if value in initial_domain and (value not in blamed or depth < blamed[value]):
+                    blamed[value] = depth
+        return set(blamed.values())
+
+    """
+    Forward checking with conflict-directed backjumping (FC-CBJ), the search of solve when backjumping is on.
+    Every frame is [var, iterator over the values left to try, checkpoint, conflict set], kept on search_stack as in
+    iterative_backtrack so that the stack length is the depth of the node; the conflict set holds the
+    depths of the assignments that made the values of var fail (culprits of the wipeouts, members of violated nogoods).
+    When every value has failed, the assignments that removed values from the domain of var join the set, and the
+    search jumps straight back to the deepest of them, handing it the rest of the set, instead of undoing only
+    the previous assignment. With a nogood store, the assignments of every such set are stored as a nogood,
+    and an assignment that completes a stored nogood fails without inference.
+    Returns the assignment if complete, False if there is no solution
+    """
+    def backjumping_backtrack(self, assignment, csp):
+        stack = self.search_stack
+        trail = self.trail
+        values = assignment.values
+        nogoods = self.nogoods
+        on_frame_exhausted = self.on_frame_exhausted
+        self.depth_of = depth_of = [-1] * self.tables.num_cells  # maps flat index to the depth it is assigned at
+        self.initial_domains = [frozenset(domain) if domain is not None else None for domain in csp.domains]
+        expand = True
+        while True:
+            if expand:
+                if assignment.is_complete():
+                    return assignment
+
+                self.steps_taken += 1
+                var = self.select_unassigned_variable()  # Returns a Variable object
+                stack.append([var, iter(self.order_domain_values(var, assignment, csp)), None, set()])
+
+            frame = stack[-1]
+            var, domain_values, checkpoint, conflicts = frame
+            depth = len(stack) - 1
+            if checkpoint is not None:
+                # Failure in the sub-tree of the value tried last (or a jump back to this frame), undo it
+                trail.rollback(checkpoint)
+                depth_of[var.index] = -1
+            expand = False
+            for x in domain_values:
+                if not assignment.is_consistent_with(var.index, x):
+                    conflicts.update(self.culprits(var.index))
+                    continue
+                checkpoint = trail.checkpoint()
+                self.assign(var, x)
+                depth_of[var.index] = depth
+                nogood = nogoods.find_violated(var.index, x, values) if nogoods is not None else None
+                if nogood is not None:
+                    conflicts.update(depth_of[index] for index, value in nogood if index != var.index)
+                elif self.inference(csp, var, x):
+                    expand = True
+                    break
+                else:
+                    conflicts.update(self.culprits(self.wiped_out))
+                    conflicts.discard(depth)
+                trail.rollback(checkpoint)
+                depth_of[var.index] = -1
+
+            if expand:
+                frame[2] = checkpoint
+                continue
+
+            stack.pop()
+            if on_frame_exhausted is not None:
+                on_frame_exhausted(len(stack) + 1, var.index)
+            conflicts.update(self.culprits(var.index))
+            if not conflicts:
+                return False  # no assignment is to blame, the puzzle has no solution
+            if nogoods is not None and len(conflicts) <= nogoods.max_size:
+                nogoods.add(frozenset((stack[d][0].index, values[stack[d][0].index]) for d in conflicts))
+            # Jump back to the deepest culprit, the frames skipped are undone by its rollback
+            jump_depth = max(conflicts)
+            while len(stack) > jump_depth + 1:
+                depth_of[stack.pop()[0].index] = -1
+            conflicts.discard(jump_depth)
+            stack[jump_depth][3].update(conflicts)
+
+    def backtrack_search(self, csp):
+        if self.backjumping:
+            return self.backjumping_backtrack(self.assignment, csp)
+        if self.iterative:
+            return self.iterative_backtrack(self.assignment, csp)
+        return self.backtrack(self.assignment, csp)
+
+    """
+    Pausable search: pre-processes on the first call, then runs iterative_backtrack for at most max_steps nodes.
+    Returns the assignment if complete, False if there is no solution, or None if paused (call again to resume)
+    """
+    def search(self, max_steps=None):
+        if not self.search_prepared:
+            self.preprocess()
+            self.search_prepared = True
+        return self.iterative_backtrack(self.assignment, self.csp, max_steps)
+
+    """
+    Enumeration mode: generator of the solutions (2D lists) in search order, with the same propagation as solve.
+    The search carries on past every solution and stops once max_solutions have been found (None for all of them).
+    Use on a new Sudoku object, steps_taken counts the nodes of the whole enumeration
+    """
+    def iter_solutions(self, max_solutions=None):
+        size = self.tables.size
+        found = 0
+        while max_solutions is None or found < max_solutions:
+            assignment = self.search()
+            if assignment is False:
+                return
+            found += 1
+            values = assignment.values
+            yield [list(values[i * size:(i + 1) * size]) for i in range(size)]
+
+    # Number of solutions of the puzzle, counting stops at max_solutions (None to count them all)
+    def count_solutions(self, max_solutions=None):
+        return sum(1 for _ in self.iter_solutions(max_solutions))
+
+    # True if the puzzle has exactly one solution, the search stops at the second one
+    def has_unique_solution(self):
+        return self.count_solutions(2) == 1
+
+    # Method to initially reduce domains of all variables based on already assigned cells
+    def initial_domain_reduction(self):
+        # Go through every row, column and grid
+        values = self.assignment.values
+        for unit in self.tables.units:
+            items = set()
+            keys_to_reduce = set()
+            for index in unit:
+                if values[index] != 0:
+                    items.add(values[index])
+                else:
+                    keys_to_reduce.add(index)
+            for key in keys_to_reduce:
+                var = self.csp.variables[key]
+                var.reduce_domain(items)
+                self.csp.domains[key] = var.domain  # reduce_domain made a new set
+
+    # Pre-processing to reduce domains, before any search
+    def preprocess(self):
+        self.initial_domain_reduction()
+        self.csp.gen_binary_constraints()
+        self.csp.build_mrv_index()
+        if self.propagation != FORWARD_CHECKING:
+            arcs = list()
+            for var in self.csp.variables:
+                if var is not None and len(var.domain) == 1:
+                    arcs.extend(self.arcs_into(self.csp, var.index))
+            self.arc_consistency(self.csp, arcs)  # a wipe out here leaves an empty domain for backtrack to fail on
+        self.apply_rules(self.csp)
+
+    def solve(self):
+        start_time = time.time()
+        given = copy.deepcopy(self.puzzle) if self.cache is not None else None  # self.ans may be self.puzzle
+        cached_solution = self.cache.get(given) if self.cache is not None else None
+        if cached_solution is not None:
+            # Cache hit, no search (steps_taken stays 0)
+            for i, row in enumerate(cached_solution):
+                self.ans[i][:] = row
+        else:
+            # Pre-processing to reduce domains
+            self.preprocess()
+            # Actual backtracking
+            valid_assignment = self.backtrack_search(self.csp)
+
+            # Writing assignment to self.ans for output. Without a solution self.ans is left as the puzzle given
+            if valid_assignment is not False:
+                for index, value in enumerate(valid_assignment.values):
+                    (i, j) = self.tables.positions[index]
+                    self.ans[i][j] = value
+                if self.cache is not None:
+                    self.cache.put(given, self.ans)
+
+        self.time_taken = (time.time() - start_time) * 1000
+        print("{0} ({1}): Time Taken (in ms) = {2}, Steps = {3}".format(self.name, self.propagation, self.time_taken,
+                                                                       str(self.steps_taken)))
+        if self.rules:
+            print("Rules fired: {0}".format(self.rule_stats()))
+
+        return self.ans
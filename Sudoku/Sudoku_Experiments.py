@@ -1,8 +1,12 @@
 import os
 import sys
 import csv
+import copy
 import Sudoku_DegreeHeuristic as SudokuDegreeHeuristic
 import Sudoku_ValueOrdering as SudokuValueOrdering
+import Sudoku_Bitmask as SudokuBitmask
+import Sudoku_DancingLinks as SudokuDancingLinks
+import Sudoku_Corpus as Corpus
 
 """
 Automated Experiment Data Generator
@@ -16,9 +20,23 @@ csv_file_name = "./experiments.csv"
 
 solver_variants= {
     1: SudokuDegreeHeuristic,
-    2: SudokuValueOrdering
+    2: SudokuValueOrdering,
+    3: SudokuBitmask,
+    4: SudokuDancingLinks
 }
 
+csv_header = ["Test File Name", "Number of Blank Cells", "Time Taken (DH Variant)",
+              "Steps Taken (DH Variant)", "Time Taken (VO Variant)", "Steps Taken (VO Variant)",
+              "Time Taken (BM Variant)", "Steps Taken (BM Variant)",
+              "Time Taken (DLX Variant)", "Steps Taken (DLX Variant)"]
+
+
+# csv module wants a binary file on Python 2 and a text file without newline translation on Python 3
+def open_csv_file(file_name):
+    if sys.version_info[0] < 3:
+        return open(file_name, 'wb')
+    return open(file_name, 'w', newline='')
+
 
 def get_input_file_names():
     os.chdir("./" + test_dir)
@@ -43,44 +61,34 @@ def get_sudoku_input_data(input_file_names):
 # Reads input_file_name
 # Returns 3-Element Tuple of (input_file_name, Number of Blank Tiles, 2D Matrix of Puzzle)
 def get_sudoku_data(input_file_name):
-    blank_tiles_count = 0
     try:
-        f = open(input_file_name, 'r')
+        puzzle = Corpus.read_grid_file(input_file_name)
     except IOError:
         raise IOError("Input File not found!")
-    
-    puzzle = [[0 for i in range(9)] for j in range(9)]
-    lines = f.readlines()
-    
-    i, j = 0, 0
-    for line in lines:
-        for number in line:
-            if number == '0':
-                blank_tiles_count += 1
-            if '0' <= number <= '9':
-                puzzle[i][j] = int(number)
-                j += 1
-                if j == 9:
-                    i += 1
-                    j = 0
+    blank_tiles_count = sum(row.count(0) for row in puzzle)
 
     return (input_file_name, blank_tiles_count, puzzle)
 
-# Takes a 2D list as the sudoku list to solve, run against the sudoku puzzle and get the experiment data
-# Returns a list representing the experimental results data for a specific input_file
+# Takes a 3-Element Tuple from get_sudoku_data, runs every variant against the sudoku puzzle
+# Returns a list representing the experimental results data for that input_file (one CSV row)
+def extract_row(sudoku_data):
+    input_file_name, blank_tiles_count, puzzle = sudoku_data
+    current_row = list([input_file_name, blank_tiles_count])
+    for variant in solver_variants.values():
+        sudoku = variant.Sudoku(copy.deepcopy(puzzle)) #instantiate Sudoku object, some variants write into puzzle
+        sudoku.solve()
+        time_taken = '{0:.2f}'.format(sudoku.time_taken) #max 2 d.p
+        steps_taken = sudoku.steps_taken
+        current_row.append(time_taken)
+        current_row.append(steps_taken)
+    return current_row
+
+# Takes a list of 3-Element Tuples from get_sudoku_input_data
+# Returns a list of rows representing the experimental results data, one per input_file
 def extract_experiment_data(input_data_list):
     exp_data = list()
     for sudoku_data in input_data_list:
-        input_file_name, blank_tiles_count, puzzle = sudoku_data
-        current_row = list([input_file_name, blank_tiles_count])
-        for variant in solver_variants.values():
-            sudoku = variant.Sudoku(puzzle) #instantiate Sudoku object
-            sudoku.solve()
-            time_taken = '{0:.2f}'.format(sudoku.time_taken) #max 2 d.p
-            steps_taken = sudoku.steps_taken
-            current_row.append(time_taken)
-            current_row.append(steps_taken)
-        exp_data.append(current_row)
+        exp_data.append(extract_row(sudoku_data))
     return exp_data
 
 
@@ -89,9 +97,8 @@ if __name__ == "__main__":
     input_data_list = get_sudoku_input_data(input_file_names)
     all_exp_data = extract_experiment_data(input_data_list)
     # print(all_exp_data)
-    with open(csv_file_name, 'wb') as f:
+    with open_csv_file(csv_file_name) as f:
         w = csv.writer(f)
-        w.writerow(["Test File Name", "Number of Blank Cells", "Time Taken (DH Variant)",
-                    "Steps Taken (DH Variant)", "Time Taken (VO Variant)", "Steps Taken (VO Variant)"])
+        w.writerow(csv_header)
         w.writerows(all_exp_data)
     print("CSV File Generated!")
@@ -0,0 +1,136 @@
+import os
+import re
+import sys
+import random
+import Sudoku_DegreeHeuristic as SudokuDegreeHeuristic
+import Sudoku_ValueOrdering as SudokuValueOrdering
+import Sudoku_Corpus as Corpus
+
+"""
+Puzzle Generator with a target difficulty band, for load testing
+1) A random solved grid: the diagonal grids (independent of each other) are filled with random permutations
+   and the search completes the rest.
+2) Clues are removed in random order. A removal is kept only if the puzzle still has a unique solution
+   (checked with the enumeration mode of uniqueness_variant) and the puzzle stays within max_steps.
+3) Difficulty is steps_taken of rating_variant, counted with the pausable search so that a puzzle above the band
+   stops being searched at max_steps. Once every clue has been tried, the puzzle is kept if it reaches min_steps,
+   otherwise a new grid is tried.
+
+python Sudoku_Generator.py output_dir num_puzzles [min_steps] [max_steps] [seed]
+Writes inputN.txt / outputN.txt pairs (the test dir layout read by Runner.py and Sudoku_Experiments.py) to
+output_dir, numbered after the inputs already there
+"""
+
+default_min_steps = 100
+default_max_steps = 1000
+max_attempts = 1000  # solved grids tried per puzzle before giving up on the band
+
+# (module, keyword arguments of Sudoku). Both need the pausable search, the uniqueness check its enumeration mode
+rating_variant = (SudokuDegreeHeuristic, {})  # steps_taken of this variant is the difficulty
+uniqueness_variant = (SudokuValueOrdering, {})  # fastest to prove uniqueness on the test dir inputs
+
+
+# A random solved N x N grid
+def generate_solution(rng, box_size=3):
+    size = box_size * box_size
+    puzzle = [[0] * size for _ in range(size)]
+    for box in range(box_size):
+        values = list(range(1, size + 1))
+        rng.shuffle(values)
+        for k, value in enumerate(values):
+            puzzle[box * box_size + k // box_size][box * box_size + k % box_size] = value
+    module, kwargs = rating_variant
+    values = module.Sudoku(puzzle, **kwargs).search().values
+    return [values[i * size:(i + 1) * size] for i in range(size)]
+
+
+def has_unique_solution(puzzle):
+    module, kwargs = uniqueness_variant
+    return module.Sudoku([row[:] for row in puzzle], **kwargs).has_unique_solution()
+
+
+# steps_taken of the rating variant on puzzle, or None if it takes more than max_steps (None for no limit)
+def rate(puzzle, max_steps=None):
+    module, kwargs = rating_variant
+    sudoku = module.Sudoku([row[:] for row in puzzle], **kwargs)
+    if sudoku.search(max_steps) is None:
+        return None
+    return sudoku.steps_taken
+
+
+"""
+Removes clues of solution in random order, keeping those whose removal would make the solution not unique
+or the puzzle harder than max_steps.
+Returns (puzzle, steps_taken of the rating variant)
+"""
+def remove_clues(solution, rng, max_steps=None):
+    size = len(solution)
+    puzzle = [row[:] for row in solution]
+    steps = rate(puzzle)
+    indices = list(range(size * size))
+    rng.shuffle(indices)
+    for index in indices:
+        i, j = index // size, index % size
+        value = puzzle[i][j]
+        puzzle[i][j] = 0
+        if has_unique_solution(puzzle):
+            new_steps = rate(puzzle, max_steps)
+            if new_steps is not None:
+                steps = new_steps
+                continue
+        puzzle[i][j] = value
+    return puzzle, steps
+
+
+"""
+A puzzle with a unique solution and min_steps <= steps_taken <= max_steps (None for no upper limit).
+Returns (puzzle, solution, steps_taken). Raises RuntimeError if no grid of max_attempts gives one
+"""
+def generate_puzzle(rng, min_steps=default_min_steps, max_steps=default_max_steps, box_size=3):
+    if max_steps is not None and max_steps < min_steps:
+        raise ValueError("Empty difficulty band: min_steps {0} > max_steps {1}".format(min_steps, max_steps))
+    for _ in range(max_attempts):
+        solution = generate_solution(rng, box_size)
+        puzzle, steps = remove_clues(solution, rng, max_steps)
+        if steps >= min_steps:
+            return puzzle, solution, steps
+    raise RuntimeError("No puzzle with {0} to {1} steps in {2} attempts".format(min_steps, max_steps, max_attempts))
+
+
+# Largest N of the inputN.txt files in directory, 0 if there are none
+def last_input_number(directory):
+    numbers = [int(match.group(1)) for match in (re.match(r"input(\d+)\.txt$", name) for name in os.listdir(directory))
+               if match is not None]
+    return max(numbers) if numbers else 0
+
+
+"""
+Generates num_puzzles puzzles in the band and writes them to directory as inputN.txt (puzzle) and
+outputN.txt (solution), N counting on from the inputs already in directory.
+Returns the list of (input file name, steps_taken)
+"""
+def write_batch(directory, num_puzzles, min_steps=default_min_steps, max_steps=default_max_steps, seed=None,
+                box_size=3):
+    rng = random.Random(seed)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    first_number = last_input_number(directory) + 1
+    written = list()
+    for number in range(first_number, first_number + num_puzzles):
+        puzzle, solution, steps = generate_puzzle(rng, min_steps, max_steps, box_size)
+        input_file_name = "input{0}.txt".format(number)
+        Corpus.write_grid_file(os.path.join(directory, input_file_name), puzzle)
+        Corpus.write_grid_file(os.path.join(directory, "output{0}.txt".format(number)), solution)
+        written.append((input_file_name, steps))
+    return written
+
+
+if __name__ == "__main__":
+    if not 3 <= len(sys.argv) <= 6:
+        print("\nUsage: python Sudoku_Generator.py output_dir num_puzzles [min_steps] [max_steps] [seed]\n")
+        raise ValueError("Wrong number of arguments!")
+    min_steps = int(sys.argv[3]) if len(sys.argv) > 3 else default_min_steps
+    max_steps = int(sys.argv[4]) if len(sys.argv) > 4 else default_max_steps
+    seed = int(sys.argv[5]) if len(sys.argv) > 5 else None
+    for input_file_name, steps in write_batch(sys.argv[1], int(sys.argv[2]), min_steps, max_steps, seed):
+        print("{0}: {1} steps".format(input_file_name, steps))
@@ -0,0 +1,176 @@
+import sys
+import json
+import time
+
+"""
+Search-tree instrumentation for the CSP variants (Sudoku_DegreeHeuristic, Sudoku_ValueOrdering).
+Sudoku(puzzle, instrumentation=Instrumentation()) wraps the search methods of that one Sudoku object to count
+and time them, for the iterative, recursive and backjumping searches. Without instrumentation nothing is wrapped,
+so the search runs exactly as before. Pre-processing (initial reduction, AC-3 and rules before the first node)
+is not counted, the counters start with the search.
+
+Counters:
+    nodes: backtrack calls that selected a variable (= steps_taken)
+    backtracks: nodes where every value failed
+    prunings: values removed from domains during search (forward checking, arc consistency and rules)
+    wipeouts: assignments whose inference emptied a domain
+    max_depth: deepest node, the root is depth 1
+    time_select, time_order, time_inference, time_rules: time (in ms) during search in select_unassigned_variable,
+    order_domain_values, inference and apply_rules
+Callbacks (all optional):
+    on_node(depth, index, domain_size): a variable was selected at a node
+    on_backtrack(depth, index): every value of the variable selected at the node failed
+    on_wipeout(depth, index, value): assigning value at index emptied a domain
+
+python Sudoku_Instrumentation.py input.txt [variant_num] [propagation]
+Solves input.txt with the variant (1 = Degree Heuristic, 2 = Value Ordering) and prints the counters as JSON
+"""
+
+# Best clock available, time.perf_counter is Python 3 only
+timer = getattr(time, "perf_counter", time.time)
+
+
+class Instrumentation(object):
+    def __init__(self, on_node=None, on_backtrack=None, on_wipeout=None):
+        self.on_node = on_node
+        self.on_backtrack = on_backtrack
+        self.on_wipeout = on_wipeout
+        self.nodes = 0
+        self.backtracks = 0
+        self.prunings = 0
+        self.wipeouts = 0
+        self.max_depth = 0
+        self.time_select = 0.0
+        self.time_order = 0.0
+        self.time_inference = 0.0
+        self.time_rules = 0.0
+        self.depth = 0  # depth of the recursive backtrack call running, 0 for the iterative search
+        self.preprocessing = False  # pre-processing is running, nothing is counted
+
+    # Wraps the search methods of sudoku (instance attributes shadow the methods, the class is untouched)
+    def attach(self, sudoku):
+        stats = self
+        backtrack = sudoku.backtrack
+        select_unassigned_variable = sudoku.select_unassigned_variable
+        order_domain_values = sudoku.order_domain_values
+        inference = sudoku.inference
+        apply_rules = sudoku.apply_rules
+        preprocess = sudoku.preprocess
+        push_removal = sudoku.trail.push_removal
+        selected = list()  # index selected at every depth of the recursive search
+
+        # Depth of the node being expanded, the iterative and backjumping searches keep one frame per node on search_stack
+        def current_depth():
+            return stats.depth or len(sudoku.search_stack)
+
+        def instrumented_backtrack(assignment, csp):
+            if assignment.is_complete():
+                return assignment
+            stats.depth += 1
+            try:
+                result = backtrack(assignment, csp)
+            finally:
+                stats.depth -= 1
+            if result is False:
+                stats.backtracks += 1
+                if stats.on_backtrack is not None:
+                    stats.on_backtrack(stats.depth + 1, selected[stats.depth])
+            del selected[stats.depth:]
+            return result
+
+        def instrumented_select_unassigned_variable():
+            start_time = timer()
+            var = select_unassigned_variable()
+            stats.time_select += timer() - start_time
+            stats.nodes += 1
+            depth = stats.depth or len(sudoku.search_stack) + 1  # the frame of the node is pushed next
+            stats.max_depth = max(stats.max_depth, depth)
+            if stats.depth:
+                selected.append(var.index)
+            if stats.on_node is not None:
+                stats.on_node(depth, var.index, len(var.domain))
+            return var
+
+        def instrumented_order_domain_values(var, assignment, csp):
+            start_time = timer()
+            values = order_domain_values(var, assignment, csp)
+            stats.time_order += timer() - start_time
+            return values
+
+        def instrumented_inference(csp, var, value):
+            start_time = timer()
+            result = inference(csp, var, value)
+            stats.time_inference += timer() - start_time
+            if not result:
+                stats.wipeouts += 1
+                if stats.on_wipeout is not None:
+                    stats.on_wipeout(current_depth(), var.index, value)
+            return result
+
+        def instrumented_apply_rules(csp, checkpoint=None):
+            start_time = timer()
+            result = apply_rules(csp, checkpoint)
+            if not stats.preprocessing:
+                stats.time_rules += timer() - start_time
+            return result
+
+        def instrumented_push_removal(index, value):
+            if not stats.preprocessing:
+                stats.prunings += 1
+            push_removal(index, value)
+
+        def instrumented_preprocess():
+            stats.preprocessing = True
+            try:
+                preprocess()
+            finally:
+                stats.preprocessing = False
+
+        def frame_exhausted(depth, index):
+            stats.backtracks += 1
+            if stats.on_backtrack is not None:
+                stats.on_backtrack(depth, index)
+
+        sudoku.backtrack = instrumented_backtrack
+        sudoku.select_unassigned_variable = instrumented_select_unassigned_variable
+        sudoku.order_domain_values = instrumented_order_domain_values
+        sudoku.inference = instrumented_inference
+        sudoku.apply_rules = instrumented_apply_rules
+        sudoku.trail.push_removal = instrumented_push_removal
+        sudoku.preprocess = instrumented_preprocess
+        sudoku.on_frame_exhausted = frame_exhausted
+
+    def to_dict(self):
+        return {
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+            "prunings": self.prunings,
+            "wipeouts": self.wipeouts,
+            "max_depth": self.max_depth,
+            "time_select": self.time_select * 1000,
+            "time_order": self.time_order * 1000,
+            "time_inference": self.time_inference * 1000,
+            "time_rules": self.time_rules * 1000,
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), sort_keys=True, **kwargs)
+
+
+if __name__ == "__main__":
+    import Sudoku_Corpus as Corpus
+    import Sudoku_DegreeHeuristic as SudokuDegreeHeuristic
+    import Sudoku_ValueOrdering as SudokuValueOrdering
+    if not 2 <= len(sys.argv) <= 4:
+        print("\nUsage: python Sudoku_Instrumentation.py input.txt [variant_num] [propagation]\n")
+        raise ValueError("Wrong number of arguments!")
+    variant = {1: SudokuDegreeHeuristic, 2: SudokuValueOrdering}[int(sys.argv[2]) if len(sys.argv) > 2 else 1]
+    propagation = sys.argv[3] if len(sys.argv) > 3 else variant.FORWARD_CHECKING
+    instrumentation = Instrumentation()
+    sudoku = variant.Sudoku(Corpus.read_grid_file(sys.argv[1]), propagation=propagation,
+                            instrumentation=instrumentation)
+    sudoku.solve()
+    result = instrumentation.to_dict()
+    result["time_taken"] = sudoku.time_taken
+    result["steps_taken"] = sudoku.steps_taken
+    print(json.dumps(result, sort_keys=True, indent=2))
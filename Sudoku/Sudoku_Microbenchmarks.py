@@ -0,0 +1,194 @@
+import os
+import sys
+import copy
+import timeit
+import Sudoku_Experiments as Experiments
+import Sudoku_DegreeHeuristic as SudokuDegreeHeuristic
+import Sudoku_ValueOrdering as SudokuValueOrdering
+from Sudoku_Tables import get_tables
+
+"""
+Microbenchmarks for the per-node operations of the CSP variants, run on the inputs in the test dir.
+Each benchmark times the current implementation against a reference copy of the implementation it replaced,
+and reports the cost per call and per backtrack node (calls per node are counted on real searches).
+
+python Sudoku_Microbenchmarks.py [num_inputs]
+num_inputs defaults to 100 (sorted by file name)
+"""
+
+default_num_inputs = 100
+repetitions = 5  # best of
+snapshots_per_input = 200  # search states sampled per input by benchmark_lcv
+
+
+# Runs fn without letting it print (solve prints its timing line)
+def run_quietly(fn, *args):
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        return fn(*args)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+# Best wall time (in ns) per call of fn(*args) over calls_list, a list of argument tuples
+def time_per_call(fn, calls_list):
+    def run():
+        for args in calls_list:
+            fn(*args)
+    best = min(timeit.repeat(run, number=1, repeat=repetitions))
+    return best * 1e9 / len(calls_list)
+
+
+def print_result(name, reference_name, reference_ns, current_name, current_ns, calls_per_node):
+    print("{0}: {1} = {2:.0f} ns/call, {3} = {4:.0f} ns/call, speedup = {5:.2f}x".format(
+        name, reference_name, reference_ns, current_name, current_ns, reference_ns / current_ns))
+    print("    {0:.1f} calls/node: {1} = {2:.2f} us/node, {3} = {4:.2f} us/node".format(
+        calls_per_node, reference_name, reference_ns * calls_per_node / 1000,
+        current_name, current_ns * calls_per_node / 1000))
+
+
+"""
+Reference: Assignment.is_consistent_with before occupancy masks, 27 probes of a dict keyed by (i, j)
+"""
+def dict_is_consistent_with(assignment_dict, position_tuple, value):
+    row_to_check = position_tuple[0]
+    col_to_check = position_tuple[1]
+
+    for i in range(0, 9):
+        if i != col_to_check:
+            if assignment_dict[(row_to_check, i)] == value:
+                return False
+
+    for j in range(0, 9):
+        if j != row_to_check:
+            if assignment_dict[(j, col_to_check)] == value:
+                return False
+
+    temp = int(row_to_check / 3)
+    temp2 = int(col_to_check / 3)
+    for i in range(temp * 3, (temp + 1) * 3):
+        for j in range(temp2 * 3, (temp2 + 1) * 3):
+            if (i, j) != position_tuple:
+                if assignment_dict[(i, j)] == value:
+                    return False
+
+    return True
+
+
+# Counts is_consistent_with calls and nodes of a Degree Heuristic search on puzzle
+def consistency_calls_per_node(puzzle):
+    sudoku = SudokuDegreeHeuristic.Sudoku([row[:] for row in puzzle])
+    original = sudoku.assignment.is_consistent_with
+    counter = [0]
+
+    def counting_is_consistent_with(index, value):
+        counter[0] += 1
+        return original(index, value)
+
+    sudoku.assignment.is_consistent_with = counting_is_consistent_with
+    run_quietly(sudoku.solve)
+    return counter[0], sudoku.steps_taken
+
+
+"""
+is_consistent_with: called on every candidate value at every backtrack node.
+Calls are made on the starting board of every input, for every blank cell and value 1..9
+"""
+def benchmark_consistency(input_data_list):
+    positions = get_tables(3).positions
+    dict_calls = list()
+    mask_calls = list()
+    total_calls = 0
+    total_nodes = 0
+    for input_file_name, blank_tiles_count, puzzle in input_data_list:
+        assignment = SudokuDegreeHeuristic.Assignment(puzzle)
+        assignment_dict = dict(assignment.assignment_dict.items())
+        for index in range(81):
+            if assignment.values[index] == 0:
+                for value in range(1, 10):
+                    dict_calls.append((assignment_dict, positions[index], value))
+                    mask_calls.append((assignment, index, value))
+        calls, nodes = consistency_calls_per_node(puzzle)
+        total_calls += calls
+        total_nodes += nodes
+
+    dict_ns = time_per_call(dict_is_consistent_with, dict_calls)
+    mask_ns = time_per_call(SudokuDegreeHeuristic.Assignment.is_consistent_with, mask_calls)
+    print_result("is_consistent_with", "dict probes", dict_ns, "occupancy masks", mask_ns,
+                 float(total_calls) / max(total_nodes, 1))
+
+
+"""
+Reference: Value Ordering order_domain_values before the per-node neighbour filter, every value scans all the
+neighbours of var and checks which are unassigned
+"""
+def scan_order_domain_values(var, assignment, csp):
+    def count_collisions(x):
+        count = 0
+        values = assignment.values
+        domains = csp.domains
+
+        neighbours = csp.get_neighbours_of_cell(var.index)
+
+        for n in neighbours:
+            if values[n] == 0 and x in domains[n]:
+                count += 1
+
+        return count
+
+    return sorted(list(var.domain), key=count_collisions)
+
+
+# Copies of (var, assignment, csp) at the first max_snapshots nodes of a Value Ordering search on puzzle
+def order_domain_values_snapshots(puzzle, max_snapshots):
+    sudoku = SudokuValueOrdering.Sudoku([row[:] for row in puzzle])
+    original = sudoku.order_domain_values
+    memo = {id(sudoku.tables): sudoku.tables}  # the tables are shared, not copied
+    snapshots = list()
+
+    def recording_order_domain_values(var, assignment, csp):
+        if len(snapshots) < max_snapshots:
+            assignment_copy, csp_copy = copy.deepcopy((assignment, csp), dict(memo))
+            snapshots.append((csp_copy.variables[var.index], assignment_copy, csp_copy))
+        return original(var, assignment, csp)
+
+    sudoku.order_domain_values = recording_order_domain_values
+    run_quietly(sudoku.solve)
+    return sudoku, snapshots
+
+
+"""
+order_domain_values (Least Constraining Value): called once per backtrack node of the Value Ordering variant.
+Calls are made on the states met at the first snapshots_per_input nodes of a search on every input
+"""
+def benchmark_lcv(input_data_list):
+    scan_calls = list()
+    current_calls = list()
+    for input_file_name, blank_tiles_count, puzzle in input_data_list:
+        sudoku, snapshots = order_domain_values_snapshots(puzzle, snapshots_per_input)
+        for var, assignment, csp in snapshots:
+            if scan_order_domain_values(var, assignment, csp) != sudoku.order_domain_values(var, assignment, csp):
+                raise AssertionError("order_domain_values disagrees with the neighbour scan on " + input_file_name)
+            scan_calls.append((var, assignment, csp))
+            current_calls.append((sudoku, var, assignment, csp))
+
+    scan_ns = time_per_call(scan_order_domain_values, scan_calls)
+    current_ns = time_per_call(SudokuValueOrdering.Sudoku.order_domain_values, current_calls)
+    print_result("order_domain_values", "neighbour scan", scan_ns, "current", current_ns, 1.0)
+
+
+benchmarks = [
+    benchmark_consistency,
+    benchmark_lcv,
+]
+
+
+if __name__ == "__main__":
+    num_inputs = int(sys.argv[1]) if len(sys.argv) > 1 else default_num_inputs
+    input_file_names = sorted(Experiments.get_input_file_names())[:num_inputs]
+    input_data_list = Experiments.get_sudoku_input_data(input_file_names)
+    print("Microbenchmarks on {0} inputs".format(len(input_data_list)))
+    for benchmark in benchmarks:
+        benchmark(input_data_list)
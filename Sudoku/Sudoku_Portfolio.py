@@ -0,0 +1,203 @@
+import os
+import sys
+import time
+import multiprocessing
+import Sudoku_Experiments as Experiments
+import Sudoku_DegreeHeuristic as SudokuDegreeHeuristic
+import Sudoku_ValueOrdering as SudokuValueOrdering
+
+try:
+    from multiprocessing.connection import wait as wait_for_connections
+except ImportError:  # Python 2, connections are waited on with select (POSIX only)
+    import select
+
+    def wait_for_connections(connections, timeout=None):
+        return select.select(connections, [], [], timeout)[0]
+
+"""
+Portfolio Solver
+Which variant is fastest depends on the puzzle, so the portfolio starts every configured variant on the same
+puzzle in its own worker process, takes the first solution that comes back and terminates the others.
+A puzzle costs the time of the fastest member, which cuts the tail latency on the hard end of the corpus
+compared to any single variant.
+Workers are started once and kept between puzzles; only the members still running when a race is won are
+terminated and started again. As most puzzles are easy for every member, the first member gets a short
+head start and the others only join the race on puzzles it has not solved by then.
+
+python Sudoku_Portfolio.py [num_inputs]
+Races the portfolio on the inputs in the test dir (all of them by default) and compares its wall time
+per puzzle with every member run on its own
+"""
+
+default_hedge_delay = 0.01  # in s, above the 99th percentile of the first member on the test dir inputs
+
+# (name, module, keyword arguments of Sudoku), the first one gets a head start. Callable arguments are called in the worker (fresh rule objects)
+portfolio = [
+    ("DH (fc)", SudokuDegreeHeuristic, {}),
+    ("VO (fc)", SudokuValueOrdering, {}),
+    ("DH (mac + rules)", SudokuDegreeHeuristic, {"propagation": SudokuDegreeHeuristic.MAC,
+                                                 "rules": SudokuDegreeHeuristic.default_rules}),
+    ("VO (mac + rules)", SudokuValueOrdering, {"propagation": SudokuValueOrdering.MAC,
+                                               "rules": SudokuValueOrdering.default_rules}),
+]
+
+
+# Solves puzzle with one member of the portfolio, returns (solution, steps_taken, time_taken in ms)
+def solve_with(member, puzzle):
+    name, module, kwargs = member
+    kwargs = dict((key, value() if callable(value) else value) for key, value in kwargs.items())
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')  # solve prints its timing line
+    try:
+        sudoku = module.Sudoku([row[:] for row in puzzle], **kwargs)
+        solution = sudoku.solve()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return solution, sudoku.steps_taken, sudoku.time_taken
+
+
+# Worker process: solves every puzzle received on connection until it receives None.
+# Sends back (solution, steps_taken, time_taken) or (None, error, 0) if the member raised
+def serve_member(connection, member):
+    while True:
+        puzzle = connection.recv()
+        if puzzle is None:
+            break
+        try:
+            connection.send(solve_with(member, puzzle))
+        except Exception as e:
+            connection.send((None, repr(e), 0))
+
+
+"""
+Worker processes racing the members on every puzzle, one per member, connected by a pipe each.
+Use as a context manager (or call close) so that the workers are stopped
+"""
+class Portfolio(object):
+    def __init__(self, members=None, hedge_delay=default_hedge_delay, max_workers=None):
+        members = members if members is not None else portfolio
+        # Members racing on a shared core only slow each other down, the ones past max_workers are left out
+        max_workers = max_workers if max_workers is not None else multiprocessing.cpu_count()
+        self.members = members[:max(max_workers, 1)]
+        self.hedge_delay = hedge_delay  # head start of the first member, in s. 0 starts every member at once
+        self.workers = [None] * len(self.members)
+        self.connections = [None] * len(self.members)
+        for member_index in range(len(self.members)):
+            self.start_worker(member_index)
+
+    def start_worker(self, member_index):
+        connection, worker_connection = multiprocessing.Pipe()
+        worker = multiprocessing.Process(target=serve_member, args=(worker_connection, self.members[member_index]))
+        worker.daemon = True
+        worker.start()
+        self.workers[member_index] = worker
+        self.connections[member_index] = connection
+
+    # Stops the workers of the members still solving, a new worker replaces each of them
+    def cancel(self, member_indices):
+        for member_index in member_indices:
+            self.workers[member_index].terminate()
+        for member_index in member_indices:
+            self.workers[member_index].join()
+            self.connections[member_index].close()
+            self.start_worker(member_index)
+
+    """
+    Races the members on puzzle.
+    The first member gets a head start of hedge_delay (in s): only if it has not finished by then are the others
+    started on the puzzle too (a hedged request), so easy puzzles do not pay for cancelling every other member.
+    Returns (name, solution, steps_taken, time_taken in ms) of the first member to finish, the others are cancelled.
+    Raises RuntimeError if every member failed, or if none finished within timeout (in s, None to wait)
+    """
+    def race(self, puzzle, timeout=None):
+        now = time.time()
+        deadline = now + timeout if timeout is not None else None
+        hedge_deadline = now + self.hedge_delay
+        waiting = list(range(len(self.members)))  # members not started yet, in order
+        running = set()
+        errors = list()
+        while running or waiting:
+            if waiting and (not running or time.time() >= hedge_deadline):
+                started = waiting if running or self.hedge_delay <= 0 else waiting[:1]
+                for member_index in started:
+                    self.connections[member_index].send(puzzle)
+                running.update(started)
+                waiting = waiting[len(started):]
+            wait_until = hedge_deadline if waiting else deadline
+            if deadline is not None and wait_until is not None:
+                wait_until = min(wait_until, deadline)
+            remaining = max(wait_until - time.time(), 0) if wait_until is not None else None
+            ready = wait_for_connections([self.connections[member_index] for member_index in running], remaining)
+            if not ready and deadline is not None and time.time() >= deadline:
+                self.cancel(running)
+                raise RuntimeError("No member of the portfolio finished within {0} s".format(timeout))
+            for connection in ready:
+                member_index = self.connections.index(connection)
+                running.discard(member_index)
+                solution, steps_taken, time_taken = connection.recv()
+                if solution is not None:
+                    self.cancel(running)
+                    return self.members[member_index][0], solution, steps_taken, time_taken
+                errors.append("{0}: {1}".format(self.members[member_index][0], steps_taken))
+        raise RuntimeError("Every member of the portfolio failed: {0}".format("; ".join(errors)))
+
+    def close(self):
+        for member_index, worker in enumerate(self.workers):
+            if worker.is_alive():
+                self.connections[member_index].send(None)
+        for member_index, worker in enumerate(self.workers):
+            worker.join()
+            self.connections[member_index].close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Races members on a single puzzle with a portfolio started for it, see Portfolio.race
+def race(puzzle, members=None, timeout=None, hedge_delay=default_hedge_delay):
+    with Portfolio(members, hedge_delay) as solver:
+        return solver.race(puzzle, timeout)
+
+
+# Value at the given percentile (0..100) of a list of numbers, nearest rank
+def percentile(items, percent):
+    items = sorted(items)
+    rank = max(int(-(-percent * len(items) // 100)), 1)  # ceil
+    return items[rank - 1]
+
+
+def print_latencies(name, times):
+    print("{0:<18} mean = {1:8.1f} ms, p50 = {2:8.1f} ms, p95 = {3:8.1f} ms, p99 = {4:8.1f} ms, max = {5:8.1f} ms".format(
+        name, sum(times) / len(times), percentile(times, 50), percentile(times, 95), percentile(times, 99), max(times)))
+
+
+if __name__ == "__main__":
+    input_file_names = sorted(Experiments.get_input_file_names())
+    if len(sys.argv) > 1:
+        input_file_names = input_file_names[:int(sys.argv[1])]
+    input_data_list = Experiments.get_sudoku_input_data(input_file_names)
+
+    member_times = dict((member[0], list()) for member in portfolio)
+    portfolio_times = list()
+    wins = dict((member[0], 0) for member in portfolio)
+    with Portfolio() as solver:
+        if len(solver.members) < len(portfolio):
+            print("Only {0} CPU(s): racing {1} of the {2} members".format(
+                multiprocessing.cpu_count(), len(solver.members), len(portfolio)))
+        for input_file_name, blank_tiles_count, puzzle in input_data_list:
+            for member in portfolio:
+                member_times[member[0]].append(solve_with(member, puzzle)[2])
+            start_time = time.time()
+            winner = solver.race(puzzle)[0]
+            portfolio_times.append((time.time() - start_time) * 1000)  # wall time, including restarting the losers
+            wins[winner] += 1
+
+    print("Wall time per puzzle on {0} inputs".format(len(input_data_list)))
+    for member in portfolio:
+        print_latencies(member[0], member_times[member[0]])
+    print_latencies("Portfolio", portfolio_times)
+    print("Portfolio wins: {0}".format(", ".join("{0} = {1}".format(member[0], wins[member[0]]) for member in portfolio)))
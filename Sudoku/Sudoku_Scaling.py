@@ -0,0 +1,145 @@
+import os
+import sys
+import random
+import multiprocessing
+import Sudoku_DegreeHeuristic as SudokuDegreeHeuristic
+import Sudoku_ValueOrdering as SudokuValueOrdering
+import Sudoku_Bitmask as SudokuBitmask
+import Sudoku_DancingLinks as SudokuDancingLinks
+from Sudoku_Tables import get_tables
+
+"""
+Scaling benchmark: how node count (steps_taken) and wall time of every variant grow with the grid size.
+Puzzles are generated for box sizes 2..max_box_size (4x4, 9x9, 16x16, 25x25 grids) by shuffling a pattern
+solution and blanking a fixed fraction of its cells, so every size is equally constrained.
+Every solve runs in a worker process and is stopped after the timeout. A variant that times out on some
+puzzle of a size is not run on larger sizes, the last size it finished is where it stops scaling.
+
+python Sudoku_Scaling.py [puzzles_per_size] [timeout_in_s] [max_box_size] [blank_fraction]
+"""
+
+default_puzzles_per_size = 5
+default_timeout = 30  # in s, per solve
+default_max_box_size = 5
+default_blank_fraction = 0.6
+seed = 3243
+
+# (name, module, keyword arguments of Sudoku), looked up by name in the worker processes
+variants = [
+    ("DH (fc)", SudokuDegreeHeuristic, {}),
+    ("DH (mac + rules)", SudokuDegreeHeuristic, {"propagation": SudokuDegreeHeuristic.MAC,
+                                                 "rules": SudokuDegreeHeuristic.default_rules}),
+    ("VO (fc)", SudokuValueOrdering, {}),
+    ("BM", SudokuBitmask, {}),
+    ("DLX", SudokuDancingLinks, {}),
+]
+
+
+# A random solved grid: the pattern grid of the box size with values, rows within bands, bands,
+# columns within stacks and stacks shuffled
+def generate_solution(box_size, rng):
+    size = box_size * box_size
+
+    def shuffled_lines():
+        groups = list(range(box_size))
+        rng.shuffle(groups)
+        lines = list()
+        for group in groups:
+            within = list(range(box_size))
+            rng.shuffle(within)
+            lines.extend(group * box_size + line for line in within)
+        return lines
+
+    values = list(range(1, size + 1))
+    rng.shuffle(values)
+    rows = shuffled_lines()
+    cols = shuffled_lines()
+    return [[values[(box_size * (row % box_size) + row // box_size + col) % size] for col in cols] for row in rows]
+
+
+# Blanks blank_fraction of the cells of a random solution. Puzzles always have a solution, not always a unique one
+def generate_puzzle(box_size, blank_fraction, rng):
+    puzzle = generate_solution(box_size, rng)
+    size = len(puzzle)
+    for index in rng.sample(range(size * size), int(round(blank_fraction * size * size))):
+        puzzle[index // size][index % size] = 0
+    return puzzle
+
+
+# Checks that ans is a complete grid keeping the given cells of puzzle, with every unit holding 1..N once
+def is_valid_solution(puzzle, ans):
+    size = len(puzzle)
+    tables = get_tables(int(round(size ** 0.5)))
+    cells = [ans[i][j] for i in range(size) for j in range(size)]
+    if any(puzzle[i][j] != 0 and puzzle[i][j] != ans[i][j] for i in range(size) for j in range(size)):
+        return False
+    expected = set(range(1, size + 1))
+    return all(set(cells[index] for index in unit) == expected for unit in tables.units)
+
+
+# Worker: solves one puzzle with the named variant, returns (steps_taken, time_taken in ms, solution is valid)
+def solve_one(variant_name, puzzle):
+    for name, module, kwargs in variants:
+        if name == variant_name:
+            break
+    kwargs = dict((key, value() if callable(value) else value) for key, value in kwargs.items())
+    sys.stdout = open(os.devnull, 'w')  # solve prints its timing line
+    sudoku = module.Sudoku([row[:] for row in puzzle], **kwargs)
+    ans = sudoku.solve()
+    return sudoku.steps_taken, sudoku.time_taken, is_valid_solution(puzzle, ans)
+
+
+# Runs solve_one in a worker process, returns its result or None if it did not finish within timeout (in s)
+def solve_with_timeout(variant_name, puzzle, timeout):
+    pool = multiprocessing.Pool(1)
+    try:
+        return pool.apply_async(solve_one, (variant_name, puzzle)).get(timeout)
+    except multiprocessing.TimeoutError:
+        return None
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def run_scaling(puzzles_per_size, timeout, max_box_size, blank_fraction):
+    rng = random.Random(seed)
+    stopped = set()  # names of the variants that timed out on a smaller size
+    print("{0:>7} {1:<18} {2:>8} {3:>12} {4:>12} {5:>14} {6:>14}".format(
+        "Grid", "Variant", "Solved", "Mean steps", "Max steps", "Mean time (ms)", "Max time (ms)"))
+    for box_size in range(2, max_box_size + 1):
+        size = box_size * box_size
+        puzzles = [generate_puzzle(box_size, blank_fraction, rng) for _ in range(puzzles_per_size)]
+        for name, module, kwargs in variants:
+            grid = "{0}x{0}".format(size)
+            if name in stopped:
+                print("{0:>7} {1:<18} {2:>8}".format(grid, name, "skipped"))
+                continue
+            results = list()
+            for puzzle in puzzles:
+                result = solve_with_timeout(name, puzzle, timeout)
+                if result is None:
+                    stopped.add(name)
+                    break
+                if not result[2]:
+                    raise AssertionError("{0} returned an invalid solution on a {1} puzzle".format(name, grid))
+                results.append(result)
+            solved = "{0}/{1}".format(len(results), puzzles_per_size)
+            if not results:
+                print("{0:>7} {1:<18} {2:>8}   timed out after {3} s".format(grid, name, solved, timeout))
+                continue
+            steps = [result[0] for result in results]
+            times = [result[1] for result in results]
+            print("{0:>7} {1:<18} {2:>8} {3:>12.0f} {4:>12} {5:>14.1f} {6:>14.1f}{7}".format(
+                grid, name, solved, float(sum(steps)) / len(steps), max(steps),
+                sum(times) / len(times), max(times),
+                "   timed out after {0} s".format(timeout) if name in stopped else ""))
+
+
+if __name__ == "__main__":
+    puzzles_per_size = int(sys.argv[1]) if len(sys.argv) > 1 else default_puzzles_per_size
+    timeout = float(sys.argv[2]) if len(sys.argv) > 2 else default_timeout
+    max_box_size = int(sys.argv[3]) if len(sys.argv) > 3 else default_max_box_size
+    blank_fraction = float(sys.argv[4]) if len(sys.argv) > 4 else default_blank_fraction
+    print("Scaling benchmark: {0} puzzles per size, {1:.0%} blanks, timeout {2} s per solve".format(
+        puzzles_per_size, blank_fraction, timeout))
+    run_scaling(puzzles_per_size, timeout, max_box_size, blank_fraction)
@@ -0,0 +1,92 @@
+"""
+Cell index tables shared by every solver variant, built once per grid size and cached.
+A grid with box size b has N = b * b rows, columns, 3x3 (b x b) grids and values, and N * N cells.
+Cells are flat indices 0..N*N-1 (index = row * N + col). Units are the N rows, N columns and N grids, in that order.
+"""
+class CellTables(object):
+    def __init__(self, box_size):
+        size = box_size * box_size
+        num_cells = size * size
+        self.box_size = box_size
+        self.size = size  # N, number of rows/columns/grids and of values
+        self.num_cells = num_cells
+
+        self.row_of = tuple(index // size for index in range(num_cells))
+        self.col_of = tuple(index % size for index in range(num_cells))
+        self.box_of = tuple((self.row_of[index] // box_size) * box_size + self.col_of[index] // box_size
+                            for index in range(num_cells))
+
+        # positions[index] = (row, col) position tuple of a flat index, index_of is the reverse mapping
+        self.positions = tuple((self.row_of[index], self.col_of[index]) for index in range(num_cells))
+        self.index_of = dict((self.positions[index], index) for index in range(num_cells))
+
+        # units[unit_index] = flat indices of the N cells in the unit
+        self.units = tuple([tuple(row * size + col for col in range(size)) for row in range(size)]
+                           + [tuple(row * size + col for row in range(size)) for col in range(size)]
+                           + [tuple(index for index in range(num_cells) if self.box_of[index] == box)
+                              for box in range(size)])
+
+        # units_of[index] = indices (in units) of the row, column and grid of the cell
+        self.units_of = tuple((self.row_of[index], size + self.col_of[index], 2 * size + self.box_of[index])
+                              for index in range(num_cells))
+
+        # peers[index] = flat indices of the other cells sharing a unit with the cell (20 for a 9x9 grid)
+        self.peers = tuple(tuple(sorted(set(other for unit_index in self.units_of[index]
+                                            for other in self.units[unit_index]) - set([index])))
+                           for index in range(num_cells))
+
+
+_tables_by_box_size = dict()
+
+
+def get_tables(box_size=3):
+    if box_size not in _tables_by_box_size:
+        _tables_by_box_size[box_size] = CellTables(box_size)
+    return _tables_by_box_size[box_size]
+
+
+# Box size of a square puzzle (2D list) of side N = box size * box size
+def box_size_of(puzzle):
+    box_size = int(round(len(puzzle) ** 0.5))
+    if box_size < 1 or box_size * box_size != len(puzzle) or any(len(row) != len(puzzle) for row in puzzle):
+        raise ValueError("Puzzle must be an N x N grid with N a perfect square, got {0} rows".format(len(puzzle)))
+    return box_size
+
+
+"""
+(i, j) view over a flat board (list or array), for callers that still index the board by position tuple.
+Reads and writes go straight through to the underlying slots. Slots holding None are treated as absent
+"""
+class PositionView(object):
+    def __init__(self, slots, tables=None):
+        self.slots = slots
+        self.tables = tables if tables is not None else get_tables()  # 9x9 tables by default
+
+    def __getitem__(self, position_tuple):
+        value = self.slots[self.tables.index_of[position_tuple]]
+        if value is None:
+            raise KeyError(position_tuple)
+        return value
+
+    def __setitem__(self, position_tuple, value):
+        self.slots[self.tables.index_of[position_tuple]] = value
+
+    def __contains__(self, position_tuple):
+        index_of = self.tables.index_of
+        return position_tuple in index_of and self.slots[index_of[position_tuple]] is not None
+
+    def __iter__(self):
+        positions = self.tables.positions
+        for index, value in enumerate(self.slots):
+            if value is not None:
+                yield positions[index]
+
+    def __len__(self):
+        return sum(1 for value in self.slots if value is not None)
+
+    def keys(self):
+        return list(self)
+
+    def items(self):
+        positions = self.tables.positions
+        return [(positions[index], value) for index, value in enumerate(self.slots) if value is not None]
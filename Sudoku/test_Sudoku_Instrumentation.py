@@ -0,0 +1,88 @@
+import os
+import sys
+import unittest
+import Sudoku_Corpus as Corpus
+import Sudoku_DegreeHeuristic as SudokuDegreeHeuristic
+import Sudoku_ValueOrdering as SudokuValueOrdering
+from Sudoku_Instrumentation import Instrumentation
+
+"""
+Tests of the counters of Sudoku_Instrumentation, for every search of the CSP variants.
+Under forward checking every blank cell is assigned by a node of its own, so the depth of a node is the number of
+cells assigned by the search so far, plus one, and a solved puzzle reaches a depth of the number of blanks
+"""
+
+input_file_name = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public_tests_p2_sudoku", "input233.txt")
+
+search_kwargs = {
+    "iterative": {},
+    "recursive": {"iterative": False},
+    "backjumping": {"backjumping": True},
+    "backjumping + nogoods": {"backjumping": True, "nogood_capacity": SudokuDegreeHeuristic.default_nogood_capacity},
+}
+
+
+class InstrumentationDepthTest(unittest.TestCase):
+    def setUp(self):
+        self.puzzle = Corpus.read_grid_file(input_file_name)
+        self.num_blanks = sum(row.count(0) for row in self.puzzle)
+
+    # Solves sudoku without printing the timing line of solve
+    def solve(self, sudoku):
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            sudoku.solve()
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+    def test_max_depth(self):
+        for variant in (SudokuDegreeHeuristic, SudokuValueOrdering):
+            for search, kwargs in sorted(search_kwargs.items()):
+                instrumentation = Instrumentation()
+                self.solve(variant.Sudoku([row[:] for row in self.puzzle], instrumentation=instrumentation, **kwargs))
+                self.assertEqual(instrumentation.max_depth, self.num_blanks, (variant.__name__, search))
+
+    def test_depth_of_callbacks(self):
+        for variant in (SudokuDegreeHeuristic, SudokuValueOrdering):
+            for search, kwargs in sorted(search_kwargs.items()):
+                depths = list()  # (depth reported, depth expected from the cells assigned by the search)
+
+                # sudoku is the object solved below, the callbacks run during its solve
+                def assigned():
+                    return self.num_blanks - sudoku.assignment.unassigned_count
+
+                def on_node(depth, index, domain_size):
+                    depths.append((depth, assigned() + 1))
+
+                def on_wipeout(depth, index, value):
+                    depths.append((depth, assigned()))
+
+                instrumentation = Instrumentation(on_node=on_node, on_wipeout=on_wipeout)
+                sudoku = variant.Sudoku([row[:] for row in self.puzzle], instrumentation=instrumentation, **kwargs)
+                self.solve(sudoku)
+                self.assertTrue(instrumentation.wipeouts > 0, (variant.__name__, search))
+                self.assertEqual([depth for depth, expected in depths], [expected for depth, expected in depths],
+                                 (variant.__name__, search))
+
+
+class InstrumentationPreprocessingTest(unittest.TestCase):
+    # AC-3 and the rules prune during pre-processing, none of it is counted
+    def test_preprocessing_not_counted(self):
+        puzzle = Corpus.read_grid_file(input_file_name)
+        for variant in (SudokuDegreeHeuristic, SudokuValueOrdering):
+            instrumentation = Instrumentation()
+            sudoku = variant.Sudoku(puzzle, propagation=variant.MAC, rules=variant.default_rules(),
+                                    instrumentation=instrumentation)
+            sudoku.preprocess()
+            self.assertTrue(len(sudoku.trail.entries) > 0, variant.__name__)
+            self.assertEqual(instrumentation.prunings, 0, variant.__name__)
+            self.assertEqual(instrumentation.time_rules, 0.0, variant.__name__)
+
+            sudoku.search()
+            self.assertTrue(instrumentation.prunings > 0, variant.__name__)
+
+
+if __name__ == "__main__":
+    unittest.main()